@@ -0,0 +1,11 @@
+import random
+
+
+def backoff_delay(attempt: int, base: float, cap: float, factor: float = 1.5, jitter: float = 0.2) -> float:
+    """
+    Seconds to wait before poll number `attempt` (0-based).
+
+    Grows `base` by `factor` per attempt up to `cap`, then scales it by a random
+    ±`jitter` fraction so concurrent jobs don't poll in lockstep.
+    """
+    return min(cap, base * factor ** attempt) * random.uniform(1 - jitter, 1 + jitter)
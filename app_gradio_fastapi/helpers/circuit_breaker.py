@@ -0,0 +1,72 @@
+import logging
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker for outbound API calls.
+
+    After `failure_threshold` consecutive failures, each within `window`
+    seconds of the previous one, the breaker opens and `is_open()` returns
+    True for `cooldown` seconds so callers can fail fast instead of waiting
+    on requests that are likely to time out. Once the cooldown elapses the
+    breaker is half-open: a single caller is let through as a probe while
+    everyone else keeps failing fast. A failed probe re-opens the breaker, a
+    successful one closes it, and a probe whose result is never recorded is
+    replaced after another cooldown.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, window: float = 30.0, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._failures = 0
+        self._last_failure_ts = 0.0
+        self._half_open = False
+        self._probe_ts = 0.0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """Return True while the breaker is short-circuiting calls."""
+        with self._lock:
+            if self._failures < self.failure_threshold:
+                return False
+            now = time.monotonic()
+            if self._half_open:
+                # Only one probe in flight at a time
+                if now - self._probe_ts < self.cooldown:
+                    return True
+            elif now - self._last_failure_ts < self.cooldown:
+                return True
+            # Cooldown elapsed (or the last probe went missing): let this call probe
+            self._half_open = True
+            self._probe_ts = now
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._half_open = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._half_open:
+                # The probe failed: open again for a full cooldown
+                self._half_open = False
+                self._failures = self.failure_threshold
+                self._last_failure_ts = now
+                logging.warning(f"{self.name} circuit breaker re-opened for {self.cooldown:.0f}s")
+                return
+            # Reset a stale streak, but never one that has already opened the breaker
+            if self._failures < self.failure_threshold - 1 and now - self._last_failure_ts > self.window:
+                self._failures = 0
+            self._failures += 1
+            self._last_failure_ts = now
+            if self._failures == self.failure_threshold:
+                logging.warning(f"{self.name} circuit breaker opened for {self.cooldown:.0f}s")
+
+    def open_message(self) -> str:
+        return f"Error: {self.name} API temporarily unavailable after repeated failures, retry shortly"
@@ -0,0 +1,36 @@
+import os
+from pathlib import Path
+
+
+def touch(path: Path) -> None:
+    """Mark a cache entry as just used, so prune_lru keeps it longest."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_lru(directory: Path, max_bytes: int, pattern: str = "*") -> None:
+    """
+    Delete the least recently used files matching pattern until the directory fits in max_bytes.
+
+    Recency is the file's mtime (see touch). Best effort: files that vanish or
+    can't be removed, e.g. because another process is pruning too, are skipped.
+    """
+    entries = []
+    for path in directory.glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
@@ -0,0 +1,65 @@
+import shutil
+from pathlib import Path
+from typing import BinaryIO
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Block size for copying response bodies to disk
+_COPY_BLOCK_SIZE = 1024 * 1024
+
+
+def write_response(response: requests.Response, file: BinaryIO) -> None:
+    """
+    Copy the body of a stream=True response into an open binary file.
+
+    shutil.copyfileobj moves the raw body in 1 MiB blocks so the copy loop stays
+    in C; decode_content undoes any gzip/deflate transfer encoding on the way.
+    """
+    response.raw.decode_content = True
+    shutil.copyfileobj(response.raw, file, length=_COPY_BLOCK_SIZE)
+
+
+def stream_to_file(session: requests.Session, url: str, path: Path, timeout: float = 120) -> None:
+    """
+    Download url to path without holding the body in memory.
+
+    Raises on HTTP errors. The response is closed on the way out, which hands
+    its connection back to the session's pool.
+    """
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            write_response(response, f)
+
+
+def make_session(pool_maxsize: int, retries: int = 3, pool_connections: int = 4) -> requests.Session:
+    """
+    Build a keep-alive session for one API, mounted on https://.
+
+    Transient 429/502/503/504 responses and connection errors are retried with
+    backoff. urllib3 only retries idempotent methods, so a POST that creates a
+    job or generation is never sent twice.
+
+    Args:
+        pool_maxsize: Connections kept alive per host; size it to the caller's concurrency
+        retries: Total retries per request
+        pool_connections: Number of per-host pools to cache
+    """
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=[429, 502, 503, 504],
+                raise_on_status=False,
+            ),
+        ),
+    )
+    return session
@@ -20,15 +20,15 @@ from pydub import AudioSegment
 from app_gradio_fastapi import routes
 from app_gradio_fastapi.helpers.session_logger import change_logging
 from app_gradio_fastapi.helpers.formatters import request_formatter
-from app_gradio_fastapi.services.voice_api import generate_rap_voice
+from app_gradio_fastapi.services.voice_api import generate_rap_voice, prepare_voice
 from app_gradio_fastapi.services.elevenlabs_api import create_style_reference
 from app_gradio_fastapi.services.beat_api import generate_beat_pattern
 from app_gradio_fastapi.services.beat_generator import get_generator
 from app_gradio_fastapi.services.lyric_api import generate_all_verses
 from app_gradio_fastapi.services.storyboard_pipeline import (
-    run_storyboard_pipeline,
+    iter_storyboard_pipeline,
     run_storyboard_only,
-    run_6shot_pipeline,
+    iter_6shot_pipeline,
     SixShotPipelineResult,
 )
 from app_gradio_fastapi.config.style_presets import (
@@ -305,6 +305,7 @@ def generate_verse_audio(
     voice_file: str,
     beat_bpm: int | None,
     beat_style: str | None,
+    voice_b64: str | None = None,
 ) -> tuple[int, str | None, str]:
     """Generate audio for a single verse. Used for parallel execution."""
     audio_path, status = generate_rap_voice(
@@ -313,6 +314,7 @@ def generate_verse_audio(
         voice_file=voice_file,
         beat_bpm=beat_bpm,
         beat_style=beat_style,
+        voice_b64=voice_b64,
     )
     return verse_num, audio_path, status
 
@@ -377,6 +379,16 @@ def handle_generate_all_audio(
                 "beat_style": beat_style,
             })
 
+    # Encode each character's voice sample once; the parallel verses share it
+    voice_samples = {}
+    for task in verse_tasks:
+        if task["voice_file"] not in voice_samples:
+            try:
+                voice_samples[task["voice_file"]] = prepare_voice(task["voice_file"])
+            except Exception:
+                # Leave it to generate_rap_voice, which reports the read error per verse
+                voice_samples[task["voice_file"]] = None
+
     # Step 3: Generate verse audio in parallel
     audio_paths = [None, None, None, None]
     errors = []
@@ -391,6 +403,7 @@ def handle_generate_all_audio(
                 task["voice_file"],
                 task["beat_bpm"],
                 task["beat_style"],
+                voice_samples[task["voice_file"]],
             ): task["verse_num"]
             for task in verse_tasks
         }
@@ -566,18 +579,21 @@ def handle_full_video_generation(
     char_a: str,
     char_b: str,
 ):
-    """Generate rap battle video with audio clips + beat + lip sync."""
+    """Generate rap battle video with audio clips + beat + lip sync, streaming progress to the UI."""
     if not script.strip():
-        return [], None, "Error: Please enter a rap script"
+        yield [], None, "Error: Please enter a rap script"
+        return
     if not location.strip():
-        return [], None, "Error: Please enter a location"
+        yield [], None, "Error: Please enter a location"
+        return
 
     # Collect audio paths for each turn
     audio_files = [audio_turn1, audio_turn2] if test_mode else [audio_turn1, audio_turn2, audio_turn3, audio_turn4]
     audio_paths = []
     for i, audio_file in enumerate(audio_files, 1):
         if audio_file is None:
-            return [], None, f"Error: Please upload audio for Turn {i}"
+            yield [], None, f"Error: Please upload audio for Turn {i}"
+            return
         path = audio_file.name if hasattr(audio_file, "name") else audio_file
         audio_paths.append(path)
 
@@ -594,7 +610,7 @@ def handle_full_video_generation(
     if speaker_b_img is not None:
         speaker_b_image_path = speaker_b_img if isinstance(speaker_b_img, str) else speaker_b_img
 
-    result = run_storyboard_pipeline(
+    for result in iter_storyboard_pipeline(
         script=script,
         video_style=video_style,
         location=location,
@@ -608,9 +624,8 @@ def handle_full_video_generation(
         character_b_desc=char_b if char_b.strip() else "confident female rapper in urban fashion",
         test_mode=test_mode,
         enable_lipsync=True,  # Always enabled
-    )
-
-    return result.storyboard_images, result.final_video, "\n".join(result.status_messages)
+    ):
+        yield result.storyboard_images, result.final_video, "\n".join(result.status_messages)
 
 
 def handle_6shot_video_generation(
@@ -629,19 +644,23 @@ def handle_6shot_video_generation(
     char_a: str,
     char_b: str,
     generate_env_ref: bool,
+    refresh_images: bool = False,
 ):
-    """Generate 6-shot rap battle video with environment reference and lip sync."""
+    """Generate 6-shot rap battle video with environment reference and lip sync, streaming progress to the UI."""
     if not script.strip():
-        return None, [], None, "Error: Please enter a rap script"
+        yield None, [], None, "Error: Please enter a rap script"
+        return
     if not location.strip():
-        return None, [], None, "Error: Please enter a location"
+        yield None, [], None, "Error: Please enter a location"
+        return
 
     # Collect audio paths for each verse (need all 4)
     audio_files = [audio_turn1, audio_turn2, audio_turn3, audio_turn4]
     audio_paths = []
     for i, audio_file in enumerate(audio_files, 1):
         if audio_file is None:
-            return None, [], None, f"Error: Please upload audio for Verse {i}"
+            yield None, [], None, f"Error: Please upload audio for Verse {i}"
+            return
         path = audio_file.name if hasattr(audio_file, "name") else audio_file
         audio_paths.append(path)
 
@@ -658,7 +677,7 @@ def handle_6shot_video_generation(
     if speaker_b_img is not None:
         speaker_b_image_path = speaker_b_img if isinstance(speaker_b_img, str) else speaker_b_img
 
-    result = run_6shot_pipeline(
+    for result in iter_6shot_pipeline(
         script=script,
         video_style=video_style,
         location=location,
@@ -672,14 +691,14 @@ def handle_6shot_video_generation(
         character_b_desc=char_b if char_b.strip() else "confident female rapper in urban fashion",
         generate_env_reference=generate_env_ref,
         enable_lipsync=True,
-    )
-
-    return (
-        result.environment_image,
-        result.storyboard_images,
-        result.final_video,
-        "\n".join(result.status_messages),
-    )
+        refresh_images=refresh_images,
+    ):
+        yield (
+            result.environment_image,
+            result.storyboard_images,
+            result.final_video,
+            "\n".join(result.status_messages),
+        )
 
 
 def handle_6shot_storyboard_preview(
@@ -711,7 +730,7 @@ def handle_6shot_storyboard_preview(
         segments.append(BattleSegment(
             index=idx,
             speaker=expected[idx] if idx < 4 else Speaker.BOTH,
-            verses=["..."],
+            verses=("...",),
             raw_text="...",
             is_conclusion=False,
         ))
@@ -738,10 +757,10 @@ def handle_6shot_storyboard_preview(
     use_reference_photos = speaker_a_img and speaker_b_img
 
     for shot in shots:
-        if shot.primary_speaker == Speaker.PERSON_A:
+        if shot.primary_speaker is Speaker.PERSON_A:
             char_desc = char_a if char_a.strip() else "intense male rapper in streetwear"
             ref_image = speaker_a_img
-        elif shot.primary_speaker == Speaker.PERSON_B:
+        elif shot.primary_speaker is Speaker.PERSON_B:
             char_desc = char_b if char_b.strip() else "confident female rapper in urban fashion"
             ref_image = speaker_b_img
         else:
@@ -751,9 +770,9 @@ def handle_6shot_storyboard_preview(
         shot_segment = BattleSegment(
             index=shot.index,
             speaker=shot.primary_speaker,
-            verses=[shot.verse_text] if shot.verse_text else ["..."],
+            verses=(shot.verse_text,) if shot.verse_text else ("...",),
             raw_text=shot.verse_text or "...",
-            is_conclusion=(shot.shot_type == ShotType.CLOSING),
+            is_conclusion=(shot.shot_type is ShotType.CLOSING),
         )
 
         if use_reference_photos and ref_image:
@@ -1322,6 +1341,11 @@ I'm the undisputed champion, standing tall and proud""",
                             value=True,
                             info="Creates a consistent environment/setting reference for all shots",
                         )
+                        refresh_images_checkbox = gr.Checkbox(
+                            label="Re-roll storyboard images",
+                            value=False,
+                            info="Generate new storyboard images instead of reusing cached ones",
+                        )
                     gr.Markdown("**Audio Clips (4 verses required for 6-shot structure)**")
                     with gr.Row():
                         audio_turn1 = gr.File(
@@ -1385,6 +1409,7 @@ I'm the undisputed champion, standing tall and proud""",
                     beat_upload,
                     char_a_input, char_b_input,
                     generate_env_ref_checkbox,
+                    refresh_images_checkbox,
                 ],
                 outputs=[env_preview, storyboard_gallery, video_output, status_output],
             )
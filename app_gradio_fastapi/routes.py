@@ -14,6 +14,7 @@ from app_gradio_fastapi.helpers import session_logger
 from app_gradio_fastapi.config.style_presets import STYLE_PRESETS, CUSTOM_UPLOAD_LABEL
 from app_gradio_fastapi.services.battle_manager import BattleManager, BattleConfig
 from app_gradio_fastapi.services.lyric_api import generate_all_verses
+from app_gradio_fastapi.services.sync_labs_api import WEBHOOK_PATH, notify_webhook
 
 
 router = APIRouter()
@@ -231,6 +232,15 @@ async def upload_image(file: UploadFile = File(...)):
     return {"file_path": file_path, "filename": file.filename}
 
 
+@router.post(f"{WEBHOOK_PATH}/{{token}}")
+async def sync_labs_webhook(token: str):
+    """Sync Labs completion callback; wakes the lip sync job waiting on it."""
+    # The waiting job re-reads the generation status itself, so the body is not trusted
+    if not notify_webhook(token):
+        raise HTTPException(status_code=404, detail="Unknown webhook")
+    return {"msg": "ok"}
+
+
 async def _save_upload(upload: UploadFile, file_type: str) -> str:
     """Save an uploaded file to a temporary location."""
     # Determine file extension
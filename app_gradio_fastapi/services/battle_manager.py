@@ -16,7 +16,7 @@ from app_gradio_fastapi.services.beat_generator import get_generator
 from app_gradio_fastapi.services.bpm_detector import detect_bpm_from_multiple, snap_bpm_to_common
 from app_gradio_fastapi.services.audio_mixer import mix_rap_and_beat, generate_waveform_data
 from app_gradio_fastapi.services.lyric_aligner import align_battle_verses
-from app_gradio_fastapi.services.runway_api import generate_video_from_image
+from app_gradio_fastapi.services.runway_api import generate_video_from_image_async
 from app_gradio_fastapi.services.sync_labs_api import lipsync_video, upload_to_temp_host
 from app_gradio_fastapi.config.style_presets import get_preset_path, get_style_instructions
 from app_gradio_fastapi.services.elevenlabs_api import create_style_reference
@@ -309,54 +309,43 @@ class BattleManager:
                 message=f"{config.fighter_b_name} style reference ready"
             )
 
-            # Stage 4: Generate Fighter A voice (Grok with style reference)
+            # Stage 4: Generate both fighters' voices (Grok with style reference).
+            # The TTS calls are independent, so they run side by side.
             await cls._emit_update(
                 battle_id,
                 stage=BattleStage.VOICE_A,
                 progress=20.0,
-                message=f"Generating voice for {config.fighter_a_name}..."
+                message=f"Generating voices for {config.fighter_a_name} and {config.fighter_b_name}..."
             )
 
-            audio_a, gen_status_a = await asyncio.to_thread(
-                generate_rap_voice,
-                lyrics=config.fighter_a_lyrics,
-                style_instructions=get_style_instructions(config.fighter_a_style) or f"aggressive battle rapper, {config.fighter_a_name} style",
-                voice_file=style_ref_a
+            (audio_a, gen_status_a), (audio_b, gen_status_b) = await asyncio.gather(
+                asyncio.to_thread(
+                    generate_rap_voice,
+                    lyrics=config.fighter_a_lyrics,
+                    style_instructions=get_style_instructions(config.fighter_a_style) or f"aggressive battle rapper, {config.fighter_a_name} style",
+                    voice_file=style_ref_a
+                ),
+                asyncio.to_thread(
+                    generate_rap_voice,
+                    lyrics=config.fighter_b_lyrics,
+                    style_instructions=get_style_instructions(config.fighter_b_style) or f"aggressive battle rapper, {config.fighter_b_name} style",
+                    voice_file=style_ref_b
+                ),
             )
 
             if not audio_a:
                 raise Exception(f"Failed to generate voice for {config.fighter_a_name}: {gen_status_a}")
-
-            await cls._emit_update(
-                battle_id,
-                progress=26.0,
-                message=f"{config.fighter_a_name} voice complete"
-            )
-
-            # Stage 5: Generate Fighter B voice (Grok with style reference)
-            await cls._emit_update(
-                battle_id,
-                stage=BattleStage.VOICE_B,
-                progress=28.0,
-                message=f"Generating voice for {config.fighter_b_name}..."
-            )
-
-            audio_b, gen_status_b = await asyncio.to_thread(
-                generate_rap_voice,
-                lyrics=config.fighter_b_lyrics,
-                style_instructions=get_style_instructions(config.fighter_b_style) or f"aggressive battle rapper, {config.fighter_b_name} style",
-                voice_file=style_ref_b
-            )
-
             if not audio_b:
                 raise Exception(f"Failed to generate voice for {config.fighter_b_name}: {gen_status_b}")
 
             state.audio_clips = [audio_a, audio_b]
 
+            # Stage 5: both voices are done once the gather returns
             await cls._emit_update(
                 battle_id,
+                stage=BattleStage.VOICE_B,
                 progress=34.0,
-                message=f"{config.fighter_b_name} voice complete"
+                message="Both voices complete"
             )
 
             # Stage 4: Detect BPM from rap audio
@@ -458,8 +447,7 @@ class BattleManager:
                     # Run both Runway video generations in parallel
                     async def gen_video_a():
                         if config.fighter_a_image_path:
-                            return await asyncio.to_thread(
-                                generate_video_from_image,
+                            return await generate_video_from_image_async(
                                 image_path=config.fighter_a_image_path,
                                 prompt_text="person rapping, subtle head movement, looking at camera, hip hop energy",
                                 duration=5
@@ -468,8 +456,7 @@ class BattleManager:
 
                     async def gen_video_b():
                         if config.fighter_b_image_path:
-                            return await asyncio.to_thread(
-                                generate_video_from_image,
+                            return await generate_video_from_image_async(
                                 image_path=config.fighter_b_image_path,
                                 prompt_text="person rapping, subtle head movement, looking at camera, hip hop energy",
                                 duration=5
@@ -502,9 +489,11 @@ class BattleManager:
                     async def lipsync_a():
                         if not base_video_a:
                             return None, "No base video"
-                        # Upload to temp host
-                        video_url, _ = await asyncio.to_thread(upload_to_temp_host, base_video_a)
-                        audio_url, _ = await asyncio.to_thread(upload_to_temp_host, audio_a)
+                        # Upload video and audio to temp host concurrently
+                        (video_url, _), (audio_url, _) = await asyncio.gather(
+                            asyncio.to_thread(upload_to_temp_host, base_video_a),
+                            asyncio.to_thread(upload_to_temp_host, audio_a),
+                        )
                         if not video_url or not audio_url:
                             return None, "Upload failed"
                         # Lip sync
@@ -521,9 +510,11 @@ class BattleManager:
                     async def lipsync_b():
                         if not base_video_b:
                             return None, "No base video"
-                        # Upload to temp host
-                        video_url, _ = await asyncio.to_thread(upload_to_temp_host, base_video_b)
-                        audio_url, _ = await asyncio.to_thread(upload_to_temp_host, audio_b)
+                        # Upload video and audio to temp host concurrently
+                        (video_url, _), (audio_url, _) = await asyncio.gather(
+                            asyncio.to_thread(upload_to_temp_host, base_video_b),
+                            asyncio.to_thread(upload_to_temp_host, audio_b),
+                        )
                         if not video_url or not audio_url:
                             return None, "Upload failed"
                         # Lip sync
@@ -12,6 +12,9 @@ from pathlib import Path
 
 import requests
 from dotenv import load_dotenv
+from requests_toolbelt import MultipartEncoder
+
+from app_gradio_fastapi.helpers.http import write_response
 
 # Find project root and load env files
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -138,13 +141,16 @@ def clone_voice(name: str, audio_file: str, description: str = "") -> tuple[str
 
     try:
         with open(audio_file, "rb") as f:
-            files = {"files": (os.path.basename(audio_file), f, "audio/mpeg")}
-            data = {
+            # Streams the sample from disk instead of building the whole body in memory
+            body = MultipartEncoder(fields={
                 "name": name,
                 "description": description or f"Cloned voice: {name}",
-            }
+                "files": (os.path.basename(audio_file), f, "audio/mpeg"),
+            })
 
-            response = requests.post(url, headers=headers, files=files, data=data, timeout=60)
+            response = requests.post(
+                url, headers={**headers, "Content-Type": body.content_type}, data=body, timeout=60
+            )
 
         if response.status_code == 200:
             voice_id = response.json().get("voice_id")
@@ -207,15 +213,20 @@ def speech_to_speech(
 
     try:
         with open(source_audio, "rb") as f:
-            files = {"audio": (os.path.basename(source_audio), f, "audio/mpeg")}
-            data = {
+            # Streams the source audio from disk instead of building the whole body in memory
+            body = MultipartEncoder(fields={
                 "model_id": model_id,
                 "remove_background_noise": str(remove_noise).lower(),
                 "voice_settings": json.dumps(voice_settings),
-            }
+                "audio": (os.path.basename(source_audio), f, "audio/mpeg"),
+            })
 
             response = requests.post(
-                url, headers=headers, files=files, data=data, stream=True, timeout=120
+                url,
+                headers={**headers, "Content-Type": body.content_type},
+                data=body,
+                stream=True,
+                timeout=120,
             )
 
         if response.status_code == 200:
@@ -230,9 +241,8 @@ def speech_to_speech(
                 suffix=".mp3", dir=output_dir, delete=False, prefix="s2s_"
             )
 
-            for chunk in response.iter_content(chunk_size=8192):
-                output_file.write(chunk)
-            output_file.close()
+            with output_file:
+                write_response(response, output_file)
 
             return output_file.name, "Speech-to-speech transformation complete"
         else:
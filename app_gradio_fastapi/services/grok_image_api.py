@@ -3,13 +3,19 @@ Grok Image API integration for storyboard generation.
 Uses xAI's grok-2-image model for image generation and editing.
 """
 
+import functools
+import io
 import os
 import requests
 import base64
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 from dotenv import load_dotenv
+from PIL import Image, ImageOps, UnidentifiedImageError
 
+from app_gradio_fastapi.helpers.http import make_session
 from app_gradio_fastapi.services.script_parser import BattleSegment, Speaker
 
 load_dotenv()  # Load .env
@@ -19,6 +25,13 @@ API_KEY = os.environ.get("XAI_API_KEY")
 API_BASE = "https://api.x.ai/v1"
 OUTPUTS_DIR = Path("outputs/storyboards")
 
+# Max concurrent Grok image requests when rendering a batch of storyboards
+IMAGE_CONCURRENCY = 5
+
+# xAI has no multi-prompt batch endpoint, so batches fan out over one
+# keep-alive pool instead of opening a TLS connection per image.
+_SESSION = make_session(pool_maxsize=IMAGE_CONCURRENCY * 2)
+
 # Shared style mapping - used by both generation and edit modes for consistency
 STYLE_MAP = {
     "Photorealistic": "photorealistic, cinematic film quality, detailed textures, realistic lighting",
@@ -40,10 +53,43 @@ DEFAULT_CLOTHING_B = "leather jacket over white t-shirt, silver watch, black pan
 CONTENT_DISCLAIMER = "Any likeness to real individuals is coincidental and may be due to a look-alike. No celebrities or protected individuals depicted."
 
 
+# Reference photos are downscaled so their longest edge is at most this many pixels
+REFERENCE_MAX_EDGE = 1024
+
+
 def image_to_base64_data_url(image_path: str) -> str:
-    """Convert a local image file to a base64 data URL for the API."""
-    path = Path(image_path)
-    mime_type, _ = mimetypes.guess_type(str(path))
+    """
+    Convert a local image file to a base64 data URL for the API.
+
+    Photos larger than REFERENCE_MAX_EDGE are downscaled first. The result is
+    memoized per file version, so a reference photo reused across shots is
+    read, resized and encoded once.
+    """
+    stat = os.stat(image_path)
+    return _prepared_data_url(os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _prepared_data_url(path: str, mtime_ns: int, size: int) -> str:
+    """Build the data URL for one version of a file (mtime/size are only part of the cache key)."""
+    try:
+        with Image.open(path) as image:
+            if max(image.size) > REFERENCE_MAX_EDGE:
+                image_format = "JPEG" if image.format == "JPEG" else "PNG"
+                # The re-encoded image has no EXIF, so apply the rotation tag to the pixels
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((REFERENCE_MAX_EDGE, REFERENCE_MAX_EDGE), Image.LANCZOS)
+                buffer = io.BytesIO()
+                if image_format == "JPEG":
+                    image.save(buffer, format="JPEG", quality=95)
+                else:
+                    image.save(buffer, format="PNG")
+                b64_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
+                return f"data:image/{image_format.lower()};base64,{b64_data}"
+    except UnidentifiedImageError:
+        pass  # Formats Pillow can't decode (e.g. HEIC) are sent as raw bytes
+
+    mime_type, _ = mimetypes.guess_type(path)
     if mime_type is None:
         mime_type = "image/png"  # Default fallback
 
@@ -84,7 +130,7 @@ Wide establishing shot showing the full venue. {style_desc}.
 {CONTENT_DISCLAIMER}"""
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_BASE}/images/generations",
             headers={
                 "Authorization": f"Bearer {API_KEY}",
@@ -145,14 +191,14 @@ def build_storyboard_prompt(
     base_style = f"8 Mile style rap battle scene in {location}. {style_desc}. Dramatic stage lighting, urban atmosphere"
 
     # Speaker-specific framing
-    if segment.speaker == Speaker.PERSON_A:
+    if segment.speaker is Speaker.PERSON_A:
         speaker_desc = character_a_desc
         pose = "aggressive stance, pointing at opponent, commanding the stage"
         if segment.index == 0:
             camera = "low angle shot looking up at rapper, crowd silhouettes in background"
         else:
             camera = "medium close-up, intense facial expression, sweat glistening under spotlights"
-    elif segment.speaker == Speaker.PERSON_B:
+    elif segment.speaker is Speaker.PERSON_B:
         speaker_desc = character_b_desc
         pose = "confident swagger, arms crossed or mic raised high"
         if segment.index == 1:
@@ -193,7 +239,7 @@ def generate_storyboard_image(
         return None, "Error: XAI_API_KEY not set in environment"
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_BASE}/images/generations",
             headers={
                 "Authorization": f"Bearer {API_KEY}",
@@ -249,6 +295,8 @@ def generate_all_storyboards(
     """
     Generate storyboard images for all battle segments.
 
+    Segments are rendered concurrently over the shared session.
+
     Args:
         segments: List of battle segments
         video_style: Visual style (Photorealistic, Pixar, Anime, etc.)
@@ -261,20 +309,41 @@ def generate_all_storyboards(
     """
     OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    image_paths = []
-    for i, segment in enumerate(segments):
+    def render(i: int, segment: BattleSegment) -> tuple[str | None, str]:
         prompt = build_storyboard_prompt(
             segment, video_style, location,
             character_a_desc, character_b_desc
         )
         output_path = OUTPUTS_DIR / f"segment_{i}_{segment.speaker.name.lower()}.png"
+        return generate_storyboard_image(prompt, output_path)
+
+    image_paths, failure = _render_all(render, segments)
+    if failure:
+        return image_paths, failure
 
-        path, status = generate_storyboard_image(prompt, output_path)
+    return image_paths, f"Generated {len(image_paths)} storyboard images"
+
+
+def _render_all(
+    render: Callable[[int, BattleSegment], tuple[str | None, str]],
+    segments: list[BattleSegment],
+) -> tuple[list[str], str | None]:
+    """
+    Run `render(index, segment)` for every segment concurrently.
+
+    Results come back in segment order; on failure the paths before the
+    first failed segment are returned along with its status.
+    """
+    with ThreadPoolExecutor(max_workers=IMAGE_CONCURRENCY) as executor:
+        results = list(executor.map(render, range(len(segments)), segments))
+
+    image_paths = []
+    for i, (path, status) in enumerate(results):
         if path is None:
             return image_paths, f"Failed at segment {i}: {status}"
         image_paths.append(path)
 
-    return image_paths, f"Generated {len(image_paths)} storyboard images"
+    return image_paths, None
 
 
 def build_edit_prompt(
@@ -312,14 +381,14 @@ def build_edit_prompt(
     scene = f"Place them in a {location}. Rap battle stage setting with dramatic lighting, crowd silhouettes in background."
 
     # IMPROVED RAP BATTLE POSES - more authentic and dynamic
-    if segment.speaker == Speaker.PERSON_A:
+    if segment.speaker is Speaker.PERSON_A:
         if segment.index == 0:
             # Opening verse - aggressive entry
             pose = "Leaning forward aggressively, one hand holding mic close to mouth, other hand making emphatic pointing gesture at opponent. Intense eye contact."
         else:
             # Comeback verse (segment 2) - defiant
             pose = "Standing tall with mic raised high, chin up, free hand dismissively waving off opponent. Confident smirk on face."
-    elif segment.speaker == Speaker.PERSON_B:
+    elif segment.speaker is Speaker.PERSON_B:
         if segment.index == 1:
             # Response verse - swagger
             pose = "Relaxed but confident stance, mic held loosely at side, head tilted with knowing smile. One eyebrow raised mockingly."
@@ -377,7 +446,7 @@ def edit_storyboard_image(
         # Convert local image to base64 data URL
         image_data_url = image_to_base64_data_url(source_image_path)
 
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_BASE}/images/edits",
             headers={
                 "Authorization": f"Bearer {API_KEY}",
@@ -402,7 +471,7 @@ def edit_storyboard_image(
         image_url = data["data"][0]["url"]
 
         # Download the image from URL
-        img_response = requests.get(image_url, timeout=60)
+        img_response = _SESSION.get(image_url, timeout=60)
         if img_response.status_code != 200:
             return None, f"Failed to download image: {img_response.status_code}"
 
@@ -437,7 +506,7 @@ def edit_all_storyboards(
     Generate storyboard images using the Image Edit API with reference photos.
 
     This transforms the speaker photos into rap battle scenes while preserving
-    their faces/identities.
+    their faces/identities. Segments are edited concurrently.
 
     Args:
         segments: List of battle segments
@@ -457,13 +526,12 @@ def edit_all_storyboards(
     actual_clothing_a = clothing_a or DEFAULT_CLOTHING_A
     actual_clothing_b = clothing_b or DEFAULT_CLOTHING_B
 
-    image_paths = []
-    for i, segment in enumerate(segments):
+    def render(i: int, segment: BattleSegment) -> tuple[str | None, str]:
         # Select source image and clothing based on speaker
-        if segment.speaker == Speaker.PERSON_A:
+        if segment.speaker is Speaker.PERSON_A:
             source_image = speaker_a_image
             clothing = actual_clothing_a
-        elif segment.speaker == Speaker.PERSON_B:
+        elif segment.speaker is Speaker.PERSON_B:
             source_image = speaker_b_image
             clothing = actual_clothing_b
         else:  # Conclusion - use Person A as default
@@ -472,10 +540,10 @@ def edit_all_storyboards(
 
         prompt = build_edit_prompt(segment, video_style, location, clothing)
         output_path = OUTPUTS_DIR / f"segment_{i}_{segment.speaker.name.lower()}_edited.png"
+        return edit_storyboard_image(source_image, prompt, output_path)
 
-        path, status = edit_storyboard_image(source_image, prompt, output_path)
-        if path is None:
-            return image_paths, f"Failed at segment {i}: {status}"
-        image_paths.append(path)
+    image_paths, failure = _render_all(render, segments)
+    if failure:
+        return image_paths, failure
 
     return image_paths, f"Generated {len(image_paths)} storyboard images from reference photos"
@@ -1,11 +1,17 @@
 """Lyric alignment service using ForceAlign for word-level timestamps."""
 
 import logging
+import os
 from pathlib import Path
 
+import numpy as np
+
 # Lazy import to avoid startup issues
 ForceAlign = None
 
+# Punctuation stripped from words before matching aligned words to lyrics
+_PUNCT_TRANS = str.maketrans("", "", ".,!?\"'")
+
 
 def _ensure_forcealign():
     """Lazy load ForceAlign and ensure NLTK data is available."""
@@ -31,6 +37,26 @@ def _ensure_forcealign():
         return False
 
 
+def _prefetch_audio(audio_path: str) -> None:
+    """Hint the OS to read the whole audio file into the page cache.
+
+    ForceAlign only accepts a file path and decodes it itself, so the best we
+    can do is make sure that decode (and any estimation fallback) reads from
+    memory rather than disk.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        fd = os.open(audio_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logging.debug(f"Audio prefetch skipped for {audio_path}: {e}")
+
+
 def align_lyrics_to_audio(
     audio_path: str,
     lyrics: str,
@@ -60,6 +86,9 @@ def align_lyrics_to_audio(
         logging.warning("No lyrics lines to align")
         return []
 
+    # Warm the page cache while ForceAlign initializes
+    _prefetch_audio(audio_path)
+
     # Ensure ForceAlign is loaded
     if not _ensure_forcealign():
         logging.warning("ForceAlign not available, using estimation")
@@ -92,12 +121,14 @@ def _group_words_into_lines(
     """Group aligned words back into lines with start/end times."""
     result = []
     word_index = 0
-    word_texts = [w.word.lower() for w in words]
+    # Clean every aligned word once instead of per comparison
+    clean_words = [w.word.lower().translate(_PUNCT_TRANS) for w in words]
 
     for line in lines:
         line_words = line.lower().split()
         if not line_words:
             continue
+        line_clean = [lw.translate(_PUNCT_TRANS) for lw in line_words]
 
         # Find start of this line in aligned words
         line_start = None
@@ -107,11 +138,10 @@ def _group_words_into_lines(
         # Search for line words in aligned words
         for i in range(word_index, len(words)):
             word = words[i]
-            word_clean = word.word.lower().strip(".,!?\"'")
+            word_clean = clean_words[i]
 
             # Check if this word matches any word in the line
-            for lw in line_words:
-                lw_clean = lw.strip(".,!?\"'")
+            for lw_clean in line_clean:
                 if word_clean == lw_clean or lw_clean in word_clean:
                     if line_start is None:
                         line_start = word.time_start
@@ -156,18 +186,13 @@ def _estimate_line_timing(
     except Exception:
         duration_sec = len(lines) * 2.5  # Assume 2.5 sec per line
 
-    time_per_line = duration_sec / len(lines)
-
-    result = []
-    for i, line in enumerate(lines):
-        result.append({
-            "text": line,
-            "start": round(i * time_per_line, 2),
-            "end": round((i + 1) * time_per_line, 2),
-            "fighter": fighter,
-        })
+    # Evenly spaced line boundaries: line i spans bounds[i]..bounds[i + 1]
+    bounds = np.round(np.linspace(0.0, duration_sec, len(lines) + 1), 2).tolist()
 
-    return result
+    return [
+        {"text": line, "start": start, "end": end, "fighter": fighter}
+        for line, start, end in zip(lines, bounds, bounds[1:])
+    ]
 
 
 def align_battle_verses(
@@ -6,29 +6,42 @@ import logging
 import os
 import re
 
+import orjson
 import requests
 from dotenv import load_dotenv
 
+from app_gradio_fastapi.helpers.circuit_breaker import CircuitBreaker
+
 load_dotenv()
 
 API_KEY = os.environ.get("XAI_API_KEY")
 API_BASE = "https://api.x.ai/v1"
 
+# Fail fast instead of stacking 60s timeouts while Grok is down
+_BREAKER = CircuitBreaker("Grok")
+
 
-VERSE_PROMPT_TEMPLATE = '''You are a legendary battle rapper known for devastating punchlines, clever wordplay, and TIGHT RHYMES.
+# The battle-wide parts of the prompt, rendered once per battle. They sit on
+# either side of the per-verse rapper block in VERSE_PROMPT_TEMPLATE.
+BATTLE_HEADER_TEMPLATE = '''You are a legendary battle rapper known for devastating punchlines, clever wordplay, and TIGHT RHYMES.
 
 BATTLE TOPIC: {topic}
 {description}
-{beat_context}
+{beat_context}'''
+
+BATTLE_SETTING_TEMPLATE = '''ATMOSPHERE: {scene_description}
+
+{tweet_context}'''
+
+
+VERSE_PROMPT_TEMPLATE = '''{battle_header}
 
 CURRENT RAPPER: {rapper_name}
 RAP STYLE: {rap_style}
 OPPONENT: {opponent_name}
 {personality_context}
 
-ATMOSPHERE: {scene_description}
-
-{tweet_context}
+{battle_setting}
 
 VERSE NUMBER: {verse_number} of 4
 {verse_context}
@@ -114,6 +127,44 @@ def _get_beat_flow_guidance(style: str | None, bpm: int | None) -> str:
     return f"\nBEAT: {style} at {bpm} BPM\nFLOW GUIDANCE: {flow_text}"
 
 
+def build_battle_context(
+    topic: str,
+    description: str,
+    scene_description: str,
+    beat_style: str | None = None,
+    beat_bpm: int | None = None,
+    tweet_context: str = "",
+) -> tuple[str, str]:
+    """
+    Build the prompt sections shared by every verse of a battle.
+
+    Everything in here is invariant across the 4 verses, so callers
+    generating a full battle should build it once and pass it to
+    generate_verse instead of re-rendering it per verse.
+
+    Returns:
+        Tuple of (rendered BATTLE_HEADER_TEMPLATE, rendered BATTLE_SETTING_TEMPLATE)
+    """
+    # Build tweet context section if provided
+    tweet_context_section = ""
+    if tweet_context:
+        tweet_context_section = f"""REAL-TIME X/TWITTER INTEL:
+{tweet_context}
+
+Use this intel to make your bars PERSONAL and CURRENT. Reference their real tweets, opinions, and any beef between them!"""
+
+    header = BATTLE_HEADER_TEMPLATE.format(
+        topic=topic,
+        description=description or "An epic rap battle",
+        beat_context=_get_beat_flow_guidance(beat_style, beat_bpm),
+    )
+    setting = BATTLE_SETTING_TEMPLATE.format(
+        scene_description=scene_description or "A packed venue with an electric crowd",
+        tweet_context=tweet_context_section,
+    )
+    return header, setting
+
+
 def generate_verse(
     rapper_name: str,
     rapper_twitter: str | None,
@@ -128,6 +179,7 @@ def generate_verse(
     beat_style: str | None = None,
     beat_bpm: int | None = None,
     tweet_context: str = "",
+    battle_context: tuple[str, str] | None = None,
 ) -> tuple[str | None, str]:
     """
     Call Grok API to generate a battle rap verse.
@@ -145,6 +197,8 @@ def generate_verse(
         beat_style: Optional beat style (trap, boom bap, west coast, drill)
         beat_bpm: Optional tempo in BPM
         tweet_context: Pre-fetched tweet context for both fighters
+        battle_context: Pre-rendered output of build_battle_context; when
+            given, topic/description/scene/beat/tweet args are not re-rendered
 
     Returns:
         Tuple of (verse_text, status_message)
@@ -158,6 +212,9 @@ def generate_verse(
     if not topic:
         return None, "Error: Battle topic is required"
 
+    if _BREAKER.is_open():
+        return None, _BREAKER.open_message()
+
     # Build personality context from Twitter handles (for research, not for lyrics)
     personality_lines = []
     if rapper_twitter:
@@ -168,29 +225,29 @@ def generate_verse(
         personality_lines.append(f"Research {opponent_name}'s personality from their Twitter ({handle}) for context, but do NOT use the handle in lyrics")
     personality_context = "\n".join(personality_lines) if personality_lines else ""
 
-    # Build tweet context section if provided
-    tweet_context_section = ""
-    if tweet_context:
-        tweet_context_section = f"""REAL-TIME X/TWITTER INTEL:
-{tweet_context}
-
-Use this intel to make your bars PERSONAL and CURRENT. Reference their real tweets, opinions, and any beef between them!"""
+    if battle_context is None:
+        battle_context = build_battle_context(
+            topic=topic,
+            description=description,
+            scene_description=scene_description,
+            beat_style=beat_style,
+            beat_bpm=beat_bpm,
+            tweet_context=tweet_context,
+        )
 
     # Get style guidance for the rapper's style
     style_guidance = RAP_STYLE_GUIDANCE.get(rap_style, "Deliver hard-hitting bars with tight rhymes and smooth flow.")
 
-    # Build the prompt
+    # Build the prompt around the pre-rendered battle sections
+    battle_header, battle_setting = battle_context
     prompt = VERSE_PROMPT_TEMPLATE.format(
-        topic=topic,
-        description=description or "An epic rap battle",
-        beat_context=_get_beat_flow_guidance(beat_style, beat_bpm),
-        scene_description=scene_description or "A packed venue with an electric crowd",
+        battle_header=battle_header,
+        battle_setting=battle_setting,
         rapper_name=rapper_name,
         rap_style=rap_style,
         style_guidance=style_guidance,
         opponent_name=opponent_name,
         personality_context=personality_context,
-        tweet_context=tweet_context_section,
         verse_number=verse_number,
         verse_context=_get_verse_context(verse_number),
         previous_verses_section=_build_previous_verses_section(previous_verses),
@@ -204,19 +261,24 @@ Use this intel to make your bars PERSONAL and CURRENT. Reference their real twee
                 "Authorization": f"Bearer {API_KEY}",
                 "Content-Type": "application/json",
             },
-            json={
+            data=orjson.dumps({
                 "model": "grok-4-1-fast-reasoning",
                 "messages": [{"role": "user", "content": prompt}],
                 "temperature": 0.8,
                 "max_tokens": 1000,
-            },
+            }),
             timeout=60,
         )
 
+        if response.status_code >= 500:
+            _BREAKER.record_failure()
+        else:
+            _BREAKER.record_success()
+
         if response.status_code != 200:
             return None, f"API Error {response.status_code}: {response.text}"
 
-        content = response.json()["choices"][0]["message"]["content"]
+        content = orjson.loads(response.content)["choices"][0]["message"]["content"]
 
         # Clean up the response
         content = content.strip()
@@ -228,10 +290,12 @@ Use this intel to make your bars PERSONAL and CURRENT. Reference their real twee
         return content.strip(), f"Verse {verse_number} generated successfully"
 
     except requests.exceptions.Timeout:
+        _BREAKER.record_failure()
         return None, "Error: Request timed out"
     except requests.exceptions.RequestException as e:
+        _BREAKER.record_failure()
         return None, f"Request error: {e}"
-    except (KeyError, IndexError) as e:
+    except (KeyError, IndexError, orjson.JSONDecodeError) as e:
         return None, f"Error parsing response: {e}"
 
 
@@ -285,13 +349,20 @@ def generate_all_verses(
     else:
         logging.info("No Twitter handles provided, skipping context fetch")
 
+    # Shared prompt header, identical for all 4 verses
+    battle_context = build_battle_context(
+        topic=topic,
+        description=description,
+        scene_description=scene_description,
+        beat_style=beat_style,
+        beat_bpm=beat_bpm,
+        tweet_context=tweet_context,
+    )
+
     # Define the verse order: (rapper_name, rapper_twitter, rapper_style, opponent_name, opponent_twitter)
-    verse_order = [
-        (char1_name, char1_twitter, char1_rap_style, char2_name, char2_twitter),  # Verse 1: char1
-        (char2_name, char2_twitter, char2_rap_style, char1_name, char1_twitter),  # Verse 2: char2
-        (char1_name, char1_twitter, char1_rap_style, char2_name, char2_twitter),  # Verse 3: char1
-        (char2_name, char2_twitter, char2_rap_style, char1_name, char1_twitter),  # Verse 4: char2
-    ]
+    char1_turn = (char1_name, char1_twitter, char1_rap_style, char2_name, char2_twitter)
+    char2_turn = (char2_name, char2_twitter, char2_rap_style, char1_name, char1_twitter)
+    verse_order = (char1_turn, char2_turn, char1_turn, char2_turn)
 
     for verse_num, (rapper, rapper_tw, rapper_style, opponent, opponent_tw) in enumerate(verse_order, 1):
         logging.info(f"Generating verse {verse_num}/4 for {rapper} in {rapper_style} style...")
@@ -309,6 +380,7 @@ def generate_all_verses(
             beat_style=beat_style,
             beat_bpm=beat_bpm,
             tweet_context=tweet_context,
+            battle_context=battle_context,
         )
 
         if verse_text is None:
@@ -4,43 +4,108 @@ Uses Runway's gen4_turbo model for image-to-video animation.
 Supports Act-Two model for lip sync with audio.
 """
 
+import asyncio
+import functools
+import hashlib
 import os
 import time
-import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import orjson
+import pybase64
 import requests
 from pathlib import Path
+from typing import Callable
 from dotenv import load_dotenv
 
-load_dotenv()
+from app_gradio_fastapi.helpers.backoff import backoff_delay
+from app_gradio_fastapi.helpers.circuit_breaker import CircuitBreaker
+from app_gradio_fastapi.helpers.disk_cache import prune_lru, touch
+from app_gradio_fastapi.helpers.http import make_session, stream_to_file
 
-RUNWAY_API_SECRET = os.environ.get("RUNWAYML_API_SECRET")
 API_BASE = "https://api.dev.runwayml.com/v1"
 API_VERSION = "2024-11-06"
 OUTPUTS_DIR = Path("outputs/videos")
 
-# Content moderation disclaimer
-CONTENT_DISCLAIMER = "Any likeness to real individuals is coincidental and may be due to a look-alike. No celebrities or protected individuals depicted."
+# Status for tasks abandoned because another task in the same batch failed
+CANCELLED_STATUS = "Cancelled after another task in the batch failed"
+
+
+@functools.cache
+def _ensure_outputs_dir() -> Path:
+    """Create OUTPUTS_DIR on first use and return it."""
+    OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+    return OUTPUTS_DIR
 
-# Legacy 5-shot camera directions (kept for backward compatibility)
-CAMERA_DIRECTIONS = {
-    0: "Cinematic low-angle push-in, performer spreads arms wide then points toward camera, head nodding to rhythm, expressive face, shoulders moving, dramatic rim lighting, atmospheric haze, passionate delivery",
-    1: "Dutch angle tracking shot, performer walks into frame with confidence, arms crossed then opening to gesture, head tilting with knowing smile, stepping forward, jewelry catching light, stylish cross-lighting",
-    2: "Extreme close-up pulling back as performer leans forward with intensity, hand gesturing toward camera, focused expression, then steps back with arms spread in confident pose, dramatic lighting",
-    3: "Steadicam arc shot, performer turning with arms extended then stopping to place hand on chest, mic hand raised then lowering to point down, head moving with energy, body grooving to beat",
-    4: "Wide crane shot, both performers step toward center stage, building tension, one raises hand while other stands confident, dramatic pause then celebration - winner jumps with arms raised, confetti falling, crowd cheering",
-}
-
-# New 6-shot camera directions for the updated storyboard structure
-CAMERA_DIRECTIONS_6SHOT = {
-    0: "Cinematic crane shot panning across crowd, revealing both performers on stage, building anticipation, slow zoom toward center stage, atmospheric haze, dramatic spotlight beams",
-    1: "Low-angle push-in, performer A spreads arms wide then points at camera, head nodding to rhythm, dramatic rim lighting, passionate delivery, expressive face",
-    2: "Dutch angle tracking shot, performer B walks into frame with swagger, confident gestures, stylish cross-lighting, jewelry catching light, head tilting with knowing smile",
-    3: "Medium shot showing both performers, focus on speaker A delivering bars while opponent B visible reacting in background, tension building, split lighting",
-    4: "Dynamic arc shot around performer B, quick cut showing A's surprised reaction, then back to B's triumphant delivery, energetic camera movement",
-    5: "Epic wide crane pullback, both performers step toward center, crowd erupting, confetti falling, triumphant finale, celebration atmosphere",
-}
 
+@functools.cache
+def _get_api_secret() -> str | None:
+    """Load .env on first use and return the Runway API secret."""
+    load_dotenv()
+    return os.environ.get("RUNWAYML_API_SECRET")
 
+
+# Fail fast instead of stacking 60s timeouts while Runway is down
+_BREAKER = CircuitBreaker("Runway")
+
+# Shared keep-alive pool so submit/poll/download reuse TLS connections.
+_SESSION = make_session(pool_maxsize=32, pool_connections=8)
+
+# Content moderation disclaimer
+CONTENT_DISCLAIMER = "Any likeness to real individuals is coincidental and may be due to a look-alike. No celebrities or protected individuals depicted."
+
+# Shared tail of every video prompt
+_PROMPT_SUFFIX = f", cinematic color grading, 24fps film look. {CONTENT_DISCLAIMER}"
+
+# Legacy 5-shot camera directions (kept for backward compatibility), indexed by segment
+CAMERA_DIRECTIONS = (
+    "Cinematic low-angle push-in, performer spreads arms wide then points toward camera, head nodding to rhythm, expressive face, shoulders moving, dramatic rim lighting, atmospheric haze, passionate delivery",
+    "Dutch angle tracking shot, performer walks into frame with confidence, arms crossed then opening to gesture, head tilting with knowing smile, stepping forward, jewelry catching light, stylish cross-lighting",
+    "Extreme close-up pulling back as performer leans forward with intensity, hand gesturing toward camera, focused expression, then steps back with arms spread in confident pose, dramatic lighting",
+    "Steadicam arc shot, performer turning with arms extended then stopping to place hand on chest, mic hand raised then lowering to point down, head moving with energy, body grooving to beat",
+    "Wide crane shot, both performers step toward center stage, building tension, one raises hand while other stands confident, dramatic pause then celebration - winner jumps with arms raised, confetti falling, crowd cheering",
+)
+
+# New 6-shot camera directions for the updated storyboard structure, indexed by shot
+CAMERA_DIRECTIONS_6SHOT = (
+    "Cinematic crane shot panning across crowd, revealing both performers on stage, building anticipation, slow zoom toward center stage, atmospheric haze, dramatic spotlight beams",
+    "Low-angle push-in, performer A spreads arms wide then points at camera, head nodding to rhythm, dramatic rim lighting, passionate delivery, expressive face",
+    "Dutch angle tracking shot, performer B walks into frame with swagger, confident gestures, stylish cross-lighting, jewelry catching light, head tilting with knowing smile",
+    "Medium shot showing both performers, focus on speaker A delivering bars while opponent B visible reacting in background, tension building, split lighting",
+    "Dynamic arc shot around performer B, quick cut showing A's surprised reaction, then back to B's triumphant delivery, energetic camera movement",
+    "Epic wide crane pullback, both performers step toward center, crowd erupting, confetti falling, triumphant finale, celebration atmosphere",
+)
+
+# Per-shot prompt templates for the 6-shot structure; only theme, speaker and
+# the optional verse fragment vary between calls
+_OPENING_SHOT_BODY = ", crowd anticipation, both performers visible, building energy"
+_CLOSING_SHOT_BODY = ", triumphant conclusion, crowd erupting, victory moment"
+_VERSE_SHOT_BODY = ", {speaker} performing with intensity{verse}"
+
+
+def _6shot_template(camera_direction: str, body: str) -> str:
+    return f"{camera_direction}, {{theme}} aesthetic, 8 Mile rap battle atmosphere{body}{_PROMPT_SUFFIX}"
+
+
+_6SHOT_TEMPLATES = tuple(
+    _6shot_template(
+        camera_direction,
+        _OPENING_SHOT_BODY if i == 0 else _CLOSING_SHOT_BODY if i == 5 else _VERSE_SHOT_BODY,
+    )
+    for i, camera_direction in enumerate(CAMERA_DIRECTIONS_6SHOT)
+)
+# Out-of-range shots get the first camera direction with a verse body
+_6SHOT_FALLBACK_TEMPLATE = _6shot_template(CAMERA_DIRECTIONS_6SHOT[0], _VERSE_SHOT_BODY)
+
+
+def _camera_direction(directions: tuple[str, ...], index: int) -> str:
+    """Look up a camera direction, falling back to the first one when out of range."""
+    if 0 <= index < len(directions):
+        return directions[index]
+    return directions[0]
+
+
+@functools.lru_cache(maxsize=256)
 def build_video_prompt(segment_index: int, theme: str, speaker: str, use_6shot: bool = False) -> str:
     """
     Build a director-style video generation prompt.
@@ -51,11 +116,9 @@ def build_video_prompt(segment_index: int, theme: str, speaker: str, use_6shot:
         speaker: "Person A", "Person B", or "Both"
         use_6shot: If True, use 6-shot camera directions
     """
-    if use_6shot:
-        camera_direction = CAMERA_DIRECTIONS_6SHOT.get(segment_index, CAMERA_DIRECTIONS_6SHOT[0])
-    else:
-        camera_direction = CAMERA_DIRECTIONS.get(segment_index, CAMERA_DIRECTIONS[0])
-    return f"{camera_direction}, {theme} aesthetic, 8 Mile rap battle atmosphere, {speaker} performing with intensity, cinematic color grading, 24fps film look. {CONTENT_DISCLAIMER}"
+    directions = CAMERA_DIRECTIONS_6SHOT if use_6shot else CAMERA_DIRECTIONS
+    camera_direction = _camera_direction(directions, segment_index)
+    return f"{camera_direction}, {theme} aesthetic, 8 Mile rap battle atmosphere, {speaker} performing with intensity{_PROMPT_SUFFIX}"
 
 
 def build_6shot_video_prompt(shot_index: int, theme: str, speaker: str, verse_context: str = "") -> str:
@@ -71,25 +134,285 @@ def build_6shot_video_prompt(shot_index: int, theme: str, speaker: str, verse_co
     Returns:
         Formatted prompt string
     """
-    camera_direction = CAMERA_DIRECTIONS_6SHOT.get(shot_index, CAMERA_DIRECTIONS_6SHOT[0])
+    if 0 <= shot_index < len(_6SHOT_TEMPLATES):
+        template = _6SHOT_TEMPLATES[shot_index]
+    else:
+        template = _6SHOT_FALLBACK_TEMPLATE
+
+    verse = f", energy capturing: {verse_context[:100]}" if verse_context else ""
+    return template.format_map({"theme": theme, "speaker": speaker, "verse": verse})
+
+
+def _headers() -> dict:
+    """Request headers for the Runway REST API."""
+    return {
+        "Authorization": f"Bearer {_get_api_secret()}",
+        "Content-Type": "application/json",
+        "X-Runway-Version": API_VERSION,
+    }
+
+
+# Multiple of 3 so each chunk encodes to base64 without padding
+_B64_CHUNK = 3 * 21846
+
+
+def _b64_file(path: str) -> str:
+    """Base64-encode a file chunk by chunk, never holding the raw bytes in full."""
+    buf = bytearray()
+    with open(path, "rb") as f:
+        while chunk := f.read(_B64_CHUNK):
+            # pybase64 dispatches to libbase64's SIMD kernels (AVX2/AVX-512/NEON)
+            buf += pybase64.b64encode(chunk)
+    # base64 output is pure ASCII, no need for UTF-8 validation
+    return buf.decode("ascii")
+
+
+# Extension -> MIME type for the files we inline as data URIs
+_IMAGE_MIME = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+_AUDIO_MIME = {".mp3": "audio/mpeg", ".wav": "audio/wav", ".m4a": "audio/m4a"}
+
 
-    # Build context-aware prompt
-    base_prompt = f"{camera_direction}, {theme} aesthetic, 8 Mile rap battle atmosphere"
+def _to_data_uri(path: str, mime_table: dict = _IMAGE_MIME, default_mime: str = "image/png") -> str:
+    """Convert a local file path to a data URI (URLs and data URIs are passed through)."""
+    if path.startswith(("http", "data:")):
+        return path
+    mime_type = mime_table.get(Path(path).suffix.lower(), default_mime)
+    # Key the cache on mtime/size so an overwritten file is re-encoded
+    stat = os.stat(path)
+    if stat.st_size > _URI_CACHE_MAX_BYTES:
+        # Large files (mostly audio) are encoded per call rather than pinned in memory
+        return f"data:{mime_type};base64,{_b64_file(path)}"
+    return _cached_data_uri(path, mime_type, stat.st_mtime_ns, stat.st_size)
 
-    if shot_index == 0:
-        # Opening shot - establishing
-        base_prompt += ", crowd anticipation, both performers visible, building energy"
-    elif shot_index == 5:
-        # Closing shot - finale
-        base_prompt += ", triumphant conclusion, crowd erupting, victory moment"
+
+# Encoded data URIs persisted across runs (files above the size cap are never cached).
+# Storyboard shots are re-rendered every run, so the directory is trimmed to
+# _URI_CACHE_DIR_MAX_BYTES, dropping the least recently used URIs first.
+_URI_CACHE_DIR = Path(".cache/data_uris")
+_URI_CACHE_MAX_BYTES = 16 * 1024 * 1024
+_URI_CACHE_DIR_MAX_BYTES = 128 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_data_uri(path: str, mime_type: str, mtime_ns: int, size: int) -> str:
+    """Encode a file as a data URI; memoized per file version in memory and on disk."""
+    # The stat fields identify the file version without reading its contents
+    key = f"{os.path.abspath(path)}|{mtime_ns}|{size}|{mime_type}".encode()
+    cache_file = _URI_CACHE_DIR / f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.uri"
+    try:
+        data_uri = cache_file.read_text(encoding="ascii")
+    except OSError:
+        pass
     else:
-        # Verse shots
-        base_prompt += f", {speaker} performing with intensity"
-        if verse_context:
-            base_prompt += f", energy capturing: {verse_context[:100]}"
+        touch(cache_file)
+        return data_uri
 
-    base_prompt += f", cinematic color grading, 24fps film look. {CONTENT_DISCLAIMER}"
-    return base_prompt
+    data_uri = f"data:{mime_type};base64,{_b64_file(path)}"
+
+    # Best effort: write to a temp file and rename so readers never see a partial URI
+    try:
+        _URI_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(data_uri, encoding="ascii")
+        os.replace(tmp_file, cache_file)
+        prune_lru(_URI_CACHE_DIR, _URI_CACHE_DIR_MAX_BYTES, "*.uri")
+    except OSError:
+        pass
+
+    return data_uri
+
+
+def _image_to_video_payload(
+    image_path: str,
+    prompt_text: str,
+    duration: int,
+    ratio: str,
+    model: str,
+    reference_image: str | None,
+) -> dict:
+    """Build the image_to_video request body."""
+    payload = {
+        "model": model,
+        "promptImage": _to_data_uri(image_path),
+        "promptText": prompt_text,
+        "ratio": ratio,
+        "duration": duration,
+    }
+
+    # Add reference image if provided (for style/character consistency)
+    if reference_image:
+        payload["references"] = [{"type": "image", "uri": _to_data_uri(reference_image)}]
+
+    return payload
+
+
+def _act_two_payload(
+    image_path: str,
+    audio_path: str,
+    prompt_text: str,
+    duration: int,
+    reference_image: str | None,
+) -> dict:
+    """Build the Act-Two lip sync request body."""
+    payload = {
+        "model": "act_two",
+        "promptImage": _to_data_uri(image_path),
+        "promptText": prompt_text,
+        "audio": _to_data_uri(audio_path, _AUDIO_MIME, "audio/mpeg"),
+        "ratio": "1280:720",
+        "duration": duration,
+    }
+
+    # Add reference image if provided (for style/character consistency)
+    if reference_image:
+        payload["references"] = [{"type": "image", "uri": _to_data_uri(reference_image)}]
+
+    return payload
+
+
+def submit_task(endpoint: str, payload: dict, headers: dict) -> tuple[str | None, str]:
+    """
+    Create a Runway generation task without waiting for it.
+
+    Args:
+        endpoint: API endpoint (image_to_video or act_two)
+        payload: Request body
+        headers: Request headers
+
+    Returns:
+        Tuple of (task_id, status_message)
+    """
+    try:
+        response = _SESSION.post(
+            f"{API_BASE}/{endpoint}",
+            headers=headers,
+            data=orjson.dumps(payload),
+            timeout=60,
+        )
+    except requests.exceptions.Timeout:
+        _BREAKER.record_failure()
+        return None, "Error: Request timed out"
+    except requests.exceptions.RequestException as e:
+        _BREAKER.record_failure()
+        return None, f"Request error: {e}"
+
+    if response.status_code >= 500:
+        _BREAKER.record_failure()
+    else:
+        _BREAKER.record_success()
+
+    if response.status_code not in [200, 201]:
+        return None, f"API Error {response.status_code}: {response.text}"
+
+    try:
+        task_data = orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        return None, f"Error parsing response: {e}"
+
+    task_id = task_data.get("id")
+    if not task_id:
+        return None, f"No task ID in response: {task_data}"
+
+    return task_id, f"Task {task_id} submitted"
+
+
+def await_task(
+    task_id: str,
+    headers: dict,
+    output_path: Path,
+    cancel_event: threading.Event | None = None,
+) -> tuple[str | None, str]:
+    """
+    Wait for a submitted task to finish and download its video.
+
+    Args:
+        task_id: The Runway task ID
+        headers: Request headers
+        output_path: Where to save the output video
+        cancel_event: Optional event that stops polling early when set
+
+    Returns:
+        Tuple of (video_path, status_message)
+    """
+    video_url, status = poll_task_completion(task_id, headers, cancel_event=cancel_event)
+
+    if video_url is None:
+        return None, status
+
+    download_status = download_video(video_url, output_path)
+    if "Error" in download_status:
+        return None, download_status
+
+    return str(output_path), download_status
+
+
+def _await_all(
+    task_ids: list[str],
+    headers: dict,
+    output_paths: list[Path],
+    on_video_ready: Callable[[int, str], None] | None = None,
+) -> list[tuple[str | None, str]]:
+    """
+    Poll and download several submitted tasks concurrently, preserving order.
+
+    Callers need the whole batch, so the first failure stops the other
+    pollers and cancels their Runway tasks instead of paying for renders
+    that will be thrown away. `on_video_ready(index, path)` is called as
+    each video lands so callers can start follow-up work early.
+    """
+    if not task_ids:
+        return []
+
+    cancel_event = threading.Event()
+    results: list[tuple[str | None, str]] = [(None, CANCELLED_STATUS)] * len(task_ids)
+
+    # Polling and downloading are I/O-bound, so threads overlap them fine
+    with ThreadPoolExecutor(max_workers=len(task_ids)) as executor:
+        futures = {
+            executor.submit(await_task, task_id, headers, output_path, cancel_event): i
+            for i, (task_id, output_path) in enumerate(zip(task_ids, output_paths))
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if results[i][0] is None:
+                cancel_event.set()
+            elif on_video_ready and not cancel_event.is_set():
+                on_video_ready(i, results[i][0])
+
+    if cancel_event.is_set():
+        for task_id, (_, status) in zip(task_ids, results):
+            if status == CANCELLED_STATUS:
+                cancel_task(task_id, headers)
+
+    return results
+
+
+def _batch_failure(results: list[tuple[str | None, str]]) -> tuple[int, str] | None:
+    """Index and status of the failure that stopped a batch, skipping tasks cancelled because of it."""
+    failures = [(i, status) for i, (video_path, status) in enumerate(results) if video_path is None]
+    for i, status in failures:
+        if status != CANCELLED_STATUS:
+            return i, status
+    return failures[0] if failures else None
+
+
+def cancel_task(task_id: str, headers: dict) -> bool:
+    """
+    Cancel a pending or running Runway task so it stops rendering.
+
+    Args:
+        task_id: The Runway task ID
+        headers: Request headers
+
+    Returns:
+        True if Runway accepted the cancellation
+    """
+    try:
+        response = _SESSION.delete(f"{API_BASE}/tasks/{task_id}", headers=headers, timeout=30)
+    except requests.exceptions.RequestException:
+        return False
+    return response.status_code in [200, 204]
 
 
 def generate_video_from_image(
@@ -116,82 +439,89 @@ def generate_video_from_image(
     Returns:
         Tuple of (video_path, status_message)
     """
-    if not RUNWAY_API_SECRET:
+    if not _get_api_secret():
         return None, "Error: RUNWAYML_API_SECRET not set in environment"
 
-    headers = {
-        "Authorization": f"Bearer {RUNWAY_API_SECRET}",
-        "Content-Type": "application/json",
-        "X-Runway-Version": API_VERSION,
-    }
-
-    # Helper to convert image path to data URI
-    def to_data_uri(path: str) -> str:
-        if path.startswith("http"):
-            return path
-        with open(path, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
-        ext = Path(path).suffix.lower()
-        mime_types = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
-        mime_type = mime_types.get(ext, "image/png")
-        return f"data:{mime_type};base64,{data}"
-
-    # Convert source image to data URI
-    prompt_image = to_data_uri(image_path)
-
-    # Build request payload
-    payload = {
-        "model": model,
-        "promptImage": prompt_image,
-        "promptText": prompt_text,
-        "ratio": ratio,
-        "duration": duration,
-    }
+    # Checked before any base64 encoding so an outage costs nothing
+    if _BREAKER.is_open():
+        return None, _BREAKER.open_message()
 
-    # Add reference image if provided (for style/character consistency)
-    if reference_image:
-        ref_uri = to_data_uri(reference_image)
-        payload["references"] = [{"type": "image", "uri": ref_uri}]
+    headers = _headers()
 
     try:
+        payload = _image_to_video_payload(image_path, prompt_text, duration, ratio, model, reference_image)
+
         # Create the task
-        response = requests.post(
-            f"{API_BASE}/image_to_video",
-            headers=headers,
-            json=payload,
-            timeout=60,
-        )
+        task_id, status = submit_task("image_to_video", payload, headers)
+        if task_id is None:
+            return None, status
+
+        if output_path is None:
+            output_path = _ensure_outputs_dir() / f"video_{task_id}.mp4"
 
-        if response.status_code not in [200, 201]:
-            return None, f"API Error {response.status_code}: {response.text}"
+        # Poll for completion and download
+        video_path, status = await_task(task_id, headers, output_path)
+        if video_path is None:
+            return None, status
 
-        task_data = response.json()
-        task_id = task_data.get("id")
+        return video_path, f"Video generated: {output_path}"
 
-        if not task_id:
-            return None, f"No task ID in response: {task_data}"
+    except Exception as e:
+        return None, f"Error: {e}"
 
-        # Poll for completion
-        video_url, status = poll_task_completion(task_id, headers)
 
-        if video_url is None:
+async def generate_video_from_image_async(
+    image_path: str,
+    prompt_text: str,
+    output_path: Path | None = None,
+    duration: int = 10,
+    ratio: str = "1280:720",
+    model: str = "gen4_turbo",
+    reference_image: str | None = None,
+) -> tuple[str | None, str]:
+    """
+    Async variant of generate_video_from_image for event-loop callers.
+
+    Encoding, submission and download run in worker threads; polling uses
+    poll_task_completion_async so several generations can wait on Runway
+    concurrently without tying up the default executor.
+
+    Returns:
+        Tuple of (video_path, status_message)
+    """
+    if not _get_api_secret():
+        return None, "Error: RUNWAYML_API_SECRET not set in environment"
+
+    # Checked before any base64 encoding so an outage costs nothing
+    if _BREAKER.is_open():
+        return None, _BREAKER.open_message()
+
+    headers = _headers()
+
+    try:
+        payload = await asyncio.to_thread(
+            _image_to_video_payload, image_path, prompt_text, duration, ratio, model, reference_image
+        )
+
+        # Create the task
+        task_id, status = await asyncio.to_thread(submit_task, "image_to_video", payload, headers)
+        if task_id is None:
             return None, status
 
-        # Download the video
         if output_path is None:
-            OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
-            output_path = OUTPUTS_DIR / f"video_{task_id}.mp4"
+            output_path = _ensure_outputs_dir() / f"video_{task_id}.mp4"
 
-        download_status = download_video(video_url, output_path)
+        # Poll for completion and download
+        video_url, status = await poll_task_completion_async(task_id, headers)
+        if video_url is None:
+            return None, status
+
+        download_status = await asyncio.to_thread(download_video, video_url, output_path)
         if "Error" in download_status:
             return None, download_status
 
         return str(output_path), f"Video generated: {output_path}"
 
-    except requests.exceptions.Timeout:
-        return None, "Error: Request timed out"
-    except requests.exceptions.RequestException as e:
-        return None, f"Request error: {e}"
     except Exception as e:
         return None, f"Error: {e}"
 
@@ -200,71 +530,131 @@ def poll_task_completion(
     task_id: str,
     headers: dict,
     max_wait: int = 300,
-    poll_interval: int = 5,
+    poll_interval: float = 0.5,
+    max_interval: float = 5.0,
+    cancel_event: threading.Event | None = None,
 ) -> tuple[str | None, str]:
     """
-    Poll for task completion.
+    Poll for task completion with jittered exponential backoff.
 
     Args:
         task_id: The Runway task ID
         headers: Request headers
         max_wait: Maximum seconds to wait
-        poll_interval: Seconds between polls
+        poll_interval: Seconds before the second poll; grows 1.5x per poll
+        max_interval: Upper bound on the delay between polls
+        cancel_event: Optional event; when set, polling stops with CANCELLED_STATUS
 
     Returns:
         Tuple of (video_url, status_message)
     """
     start_time = time.time()
+    attempt = 0
 
     while time.time() - start_time < max_wait:
         try:
-            response = requests.get(
+            response = _SESSION.get(
                 f"{API_BASE}/tasks/{task_id}",
                 headers=headers,
                 timeout=30,
             )
+            done, video_url, status = _parse_task_status(response)
+        except Exception as e:
+            return None, f"Poll error: {e}"
 
-            if response.status_code != 200:
-                return None, f"Poll Error {response.status_code}: {response.text}"
+        if done:
+            return video_url, status
 
-            task_data = response.json()
-            status = task_data.get("status", "UNKNOWN")
+        delay = _poll_delay(response, attempt, poll_interval, max_interval)
+        if cancel_event is None:
+            time.sleep(delay)
+        elif cancel_event.wait(delay):
+            return None, CANCELLED_STATUS
+        attempt += 1
 
-            if status == "SUCCEEDED":
-                # Get the output URL
-                output = task_data.get("output", [])
-                if output and len(output) > 0:
-                    return output[0], "Task completed successfully"
-                return None, "Task completed but no output found"
+    return None, f"Timeout: Task did not complete within {max_wait} seconds"
 
-            elif status == "FAILED":
-                error = task_data.get("failure", "Unknown error")
-                return None, f"Task failed: {error}"
 
-            elif status in ["PENDING", "RUNNING"]:
-                time.sleep(poll_interval)
-                continue
+async def poll_task_completion_async(
+    task_id: str,
+    headers: dict,
+    max_wait: int = 300,
+    poll_interval: float = 0.5,
+    max_interval: float = 5.0,
+) -> tuple[str | None, str]:
+    """
+    Async variant of poll_task_completion.
 
-            else:
-                return None, f"Unknown status: {status}"
+    Each status request runs in a worker thread, but the waits between polls
+    are asyncio sleeps, so no thread is held while Runway renders.
+    """
+    start_time = time.time()
+    attempt = 0
 
+    while time.time() - start_time < max_wait:
+        try:
+            response = await asyncio.to_thread(
+                _SESSION.get,
+                f"{API_BASE}/tasks/{task_id}",
+                headers=headers,
+                timeout=30,
+            )
+            done, video_url, status = _parse_task_status(response)
         except Exception as e:
             return None, f"Poll error: {e}"
 
+        if done:
+            return video_url, status
+
+        await asyncio.sleep(_poll_delay(response, attempt, poll_interval, max_interval))
+        attempt += 1
+
     return None, f"Timeout: Task did not complete within {max_wait} seconds"
 
 
+def _parse_task_status(response: requests.Response) -> tuple[bool, str | None, str]:
+    """
+    Interpret one task status response.
+
+    Returns:
+        Tuple of (done, video_url, status_message); done is False while the
+        task is still PENDING or RUNNING
+    """
+    if response.status_code != 200:
+        return True, None, f"Poll Error {response.status_code}: {response.text}"
+
+    task_data = orjson.loads(response.content)
+    status = task_data.get("status", "UNKNOWN")
+
+    if status == "SUCCEEDED":
+        # Get the output URL
+        output = task_data.get("output", [])
+        if output and len(output) > 0:
+            return True, output[0], "Task completed successfully"
+        return True, None, "Task completed but no output found"
+
+    elif status == "FAILED":
+        error = task_data.get("failure", "Unknown error")
+        return True, None, f"Task failed: {error}"
+
+    elif status in ["PENDING", "RUNNING"]:
+        return False, None, status
+
+    return True, None, f"Unknown status: {status}"
+
+
+def _poll_delay(response: requests.Response, attempt: int, poll_interval: float, max_interval: float) -> float:
+    """Seconds to wait before the next poll: server pacing if given, else jittered backoff."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return backoff_delay(attempt, poll_interval, max_interval)
+
+
 def download_video(url: str, output_path: Path) -> str:
     """Download video from URL to local path."""
     try:
-        response = requests.get(url, stream=True, timeout=120)
-        response.raise_for_status()
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
+        stream_to_file(_SESSION, url, output_path)
         return f"Downloaded to {output_path}"
     except Exception as e:
         return f"Error downloading video: {e}"
@@ -275,37 +665,67 @@ def generate_all_videos(
     theme: str,
     speakers: list[str],
     duration: int = 10,
+    on_video_ready: Callable[[int, str], None] | None = None,
 ) -> tuple[list[str], str]:
     """
     Generate videos for all storyboard images.
 
+    All tasks are submitted up front so Runway renders them side by side,
+    then polled and downloaded concurrently. The first failure cancels the
+    remaining tasks and no partial list is returned.
+
     Args:
         image_paths: List of image file paths
         theme: Visual theme
         speakers: List of speaker names for each segment
         duration: Video duration in seconds (5 or 10)
+        on_video_ready: Optional callback `(segment_index, video_path)` invoked
+            as each video finishes downloading, before the batch completes
 
     Returns:
         Tuple of (list of video paths, status message)
     """
-    OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+    if not _get_api_secret():
+        return [], "Error: RUNWAYML_API_SECRET not set in environment"
+
+    _ensure_outputs_dir()
+    headers = _headers()
 
-    video_paths = []
+    # Submit every segment before waiting on any of them
+    task_ids = []
+    failure = None
     for i, (image_path, speaker) in enumerate(zip(image_paths, speakers)):
+        if _BREAKER.is_open():
+            failure = f"Failed at segment {i}: {_BREAKER.open_message()}"
+            break
+
         prompt = build_video_prompt(i, theme, speaker)
-        output_path = OUTPUTS_DIR / f"segment_{i}.mp4"
+        try:
+            payload = _image_to_video_payload(image_path, prompt, duration, "1280:720", "gen4_turbo", None)
+            task_id, status = submit_task("image_to_video", payload, headers)
+        except Exception as e:
+            task_id, status = None, f"Error: {e}"
 
-        video_path, status = generate_video_from_image(
-            image_path=image_path,
-            prompt_text=prompt,
-            output_path=output_path,
-            duration=duration,
-        )
+        if task_id is None:
+            failure = f"Failed at segment {i}: {status}"
+            break
+        task_ids.append(task_id)
 
-        if video_path is None:
-            return video_paths, f"Failed at segment {i}: {status}"
-        video_paths.append(video_path)
+    # A partial batch is useless, so stop the tasks already submitted
+    if failure:
+        for task_id in task_ids:
+            cancel_task(task_id, headers)
+        return [], failure
+
+    output_paths = [OUTPUTS_DIR / f"segment_{i}.mp4" for i in range(len(task_ids))]
+    results = _await_all(task_ids, headers, output_paths, on_video_ready)
 
+    failed = _batch_failure(results)
+    if failed:
+        i, status = failed
+        return [], f"Failed at segment {i}: {status}"
+
+    video_paths = [video_path for video_path, _ in results]
     return video_paths, f"Generated {len(video_paths)} videos"
 
 
@@ -331,100 +751,64 @@ def generate_video_with_lipsync(
     Returns:
         Tuple of (video_path, status_message)
     """
-    if not RUNWAY_API_SECRET:
+    if not _get_api_secret():
         return None, "Error: RUNWAYML_API_SECRET not set in environment"
 
-    headers = {
-        "Authorization": f"Bearer {RUNWAY_API_SECRET}",
-        "Content-Type": "application/json",
-        "X-Runway-Version": API_VERSION,
-    }
+    # Checked before any base64 encoding so an outage costs nothing
+    if _BREAKER.is_open():
+        return None, _BREAKER.open_message()
 
-    # Helper to convert image path to data URI
-    def to_data_uri(path: str) -> str:
-        if path.startswith("http"):
-            return path
-        with open(path, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
-        ext = Path(path).suffix.lower()
-        mime_types = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
-        mime_type = mime_types.get(ext, "image/png")
-        return f"data:{mime_type};base64,{data}"
-
-    # Convert image to data URI
-    prompt_image = to_data_uri(image_path)
-
-    # Convert audio to data URI
-    if audio_path.startswith("http"):
-        audio_uri = audio_path
-    else:
-        with open(audio_path, "rb") as f:
-            audio_data = base64.b64encode(f.read()).decode("utf-8")
-        ext = Path(audio_path).suffix.lower()
-        audio_mime_types = {".mp3": "audio/mpeg", ".wav": "audio/wav", ".m4a": "audio/m4a"}
-        audio_mime_type = audio_mime_types.get(ext, "audio/mpeg")
-        audio_uri = f"data:{audio_mime_type};base64,{audio_data}"
+    headers = _headers()
 
     try:
-        # Build request payload
-        payload = {
-            "model": "act_two",
-            "promptImage": prompt_image,
-            "promptText": prompt_text,
-            "audio": audio_uri,
-            "ratio": "1280:720",
-            "duration": duration,
-        }
-
-        # Add reference image if provided (for style/character consistency)
-        if reference_image:
-            ref_uri = to_data_uri(reference_image)
-            payload["references"] = [{"type": "image", "uri": ref_uri}]
+        payload = _act_two_payload(image_path, audio_path, prompt_text, duration, reference_image)
 
         # Act-Two API call
         # Note: The exact API structure may need adjustment based on actual Runway API docs
-        response = requests.post(
-            f"{API_BASE}/act_two",
-            headers=headers,
-            json=payload,
-            timeout=60,
-        )
-
-        if response.status_code not in [200, 201]:
-            # Fallback to regular image-to-video if Act-Two fails
-            return None, f"Act-Two API Error {response.status_code}: {response.text}. Consider using regular video generation."
-
-        task_data = response.json()
-        task_id = task_data.get("id")
-
-        if not task_id:
-            return None, f"No task ID in response: {task_data}"
-
-        # Poll for completion
-        video_url, status = poll_task_completion(task_id, headers)
-
-        if video_url is None:
+        task_id, status = submit_task("act_two", payload, headers)
+        if task_id is None:
+            if status.startswith("API Error"):
+                # Caller can fall back to regular image-to-video if Act-Two fails
+                return None, f"Act-Two {status}. Consider using regular video generation."
             return None, status
 
-        # Download the video
         if output_path is None:
-            OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
-            output_path = OUTPUTS_DIR / f"lipsync_{task_id}.mp4"
+            output_path = _ensure_outputs_dir() / f"lipsync_{task_id}.mp4"
 
-        download_status = download_video(video_url, output_path)
-        if "Error" in download_status:
-            return None, download_status
+        # Poll for completion and download
+        video_path, status = await_task(task_id, headers, output_path)
+        if video_path is None:
+            return None, status
 
-        return str(output_path), f"Video with lip sync generated: {output_path}"
+        return video_path, f"Video with lip sync generated: {output_path}"
 
-    except requests.exceptions.Timeout:
-        return None, "Error: Request timed out"
-    except requests.exceptions.RequestException as e:
-        return None, f"Request error: {e}"
     except Exception as e:
         return None, f"Error: {e}"
 
 
+def _submit_6shot_task(
+    image_path: str,
+    prompt: str,
+    audio_path: str | None,
+    duration: int,
+    environment_ref: str | None,
+    headers: dict,
+) -> tuple[str | None, str]:
+    """Submit one 6-shot task, using Act-Two when audio is given and falling back to image-to-video."""
+    if audio_path:
+        # Try Act-Two for lip sync
+        payload = _act_two_payload(image_path, audio_path, prompt, duration, environment_ref)
+        task_id, status = submit_task("act_two", payload, headers)
+
+        # Fallback to regular generation if lip sync is rejected
+        if task_id is not None or not status.startswith("API Error"):
+            return task_id, status
+
+    # Regular video generation for opening/closing shots
+    payload = _image_to_video_payload(image_path, prompt, duration, "1280:720", "gen4_turbo", environment_ref)
+    return submit_task("image_to_video", payload, headers)
+
+
 def generate_6shot_videos(
     image_paths: list[str],
     theme: str,
@@ -438,6 +822,10 @@ def generate_6shot_videos(
     """
     Generate videos for the 6-shot storyboard structure.
 
+    All six tasks are submitted up front so Runway renders them side by
+    side, then polled and downloaded concurrently. The first failure cancels
+    the remaining tasks and no partial list is returned.
+
     Args:
         image_paths: List of 6 image file paths
         theme: Visual theme
@@ -454,52 +842,61 @@ def generate_6shot_videos(
     if len(image_paths) != 6:
         return [], f"Expected 6 images, got {len(image_paths)}"
 
-    OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+    if not _get_api_secret():
+        return [], "Error: RUNWAYML_API_SECRET not set in environment"
 
-    video_paths = []
+    _ensure_outputs_dir()
+    headers = _headers()
     verse_contexts = verse_contexts or [""] * 6
 
+    # The environment reference is shared by all six shots, encode it once
+    if environment_ref:
+        try:
+            environment_ref = _to_data_uri(environment_ref)
+        except OSError as e:
+            return [], f"Error reading environment reference: {e}"
+
+    # Submit every shot before waiting on any of them
+    task_ids = []
+    failure = None
     for i, (image_path, speaker) in enumerate(zip(image_paths, speakers)):
+        if _BREAKER.is_open():
+            failure = f"Failed at shot {i}: {_BREAKER.open_message()}"
+            break
+
         verse_context = verse_contexts[i] if i < len(verse_contexts) else ""
         prompt = build_6shot_video_prompt(i, theme, speaker, verse_context)
-        output_path = OUTPUTS_DIR / f"shot_{i}.mp4"
 
         # Use lip sync for verse shots (1-4) if enabled and audio provided
         is_verse_shot = 1 <= i <= 4
         audio_index = i - 1  # Map shot 1-4 to audio 0-3
-
+        audio_path = None
         if enable_lipsync and is_verse_shot and audio_paths and audio_index < len(audio_paths):
-            # Try Act-Two for lip sync
-            video_path, status = generate_video_with_lipsync(
-                image_path=image_path,
-                audio_path=audio_paths[audio_index],
-                prompt_text=prompt,
-                output_path=output_path,
-                duration=duration,
-                reference_image=environment_ref,
-            )
+            audio_path = audio_paths[audio_index]
 
-            # Fallback to regular generation if lip sync fails
-            if video_path is None and "Act-Two API Error" in status:
-                video_path, status = generate_video_from_image(
-                    image_path=image_path,
-                    prompt_text=prompt,
-                    output_path=output_path,
-                    duration=duration,
-                    reference_image=environment_ref,
-                )
-        else:
-            # Regular video generation for opening/closing shots
-            video_path, status = generate_video_from_image(
-                image_path=image_path,
-                prompt_text=prompt,
-                output_path=output_path,
-                duration=duration,
-                reference_image=environment_ref,
-            )
+        try:
+            task_id, status = _submit_6shot_task(image_path, prompt, audio_path, duration, environment_ref, headers)
+        except Exception as e:
+            task_id, status = None, f"Error: {e}"
 
-        if video_path is None:
-            return video_paths, f"Failed at shot {i}: {status}"
-        video_paths.append(video_path)
+        if task_id is None:
+            failure = f"Failed at shot {i}: {status}"
+            break
+        task_ids.append(task_id)
+
+    # A partial batch is useless, so stop the tasks already submitted
+    if failure:
+        for task_id in task_ids:
+            cancel_task(task_id, headers)
+        return [], failure
+
+    output_paths = [OUTPUTS_DIR / f"shot_{i}.mp4" for i in range(len(task_ids))]
+    results = _await_all(task_ids, headers, output_paths)
+
+    failed = _batch_failure(results)
+    if failed:
+        i, status = failed
+        return [], f"Failed at shot {i}: {status}"
 
+    video_paths = [video_path for video_path, _ in results]
     return video_paths, f"Generated {len(video_paths)} videos (6-shot structure)"
@@ -3,17 +3,51 @@ Script parser for rap battle scripts.
 Extracts Person A / Person B turns and verses.
 """
 
+import functools
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
 
+# Enum members are singletons: compare Speaker/ShotType values with `is`
 class Speaker(Enum):
     PERSON_A = "Person A"
     PERSON_B = "Person B"
     BOTH = "Both"
 
 
+# Speaker marker lines ("[Person A]", "Person B:", "[Conclusion]", custom names).
+# Only horizontal whitespace is allowed so a marker never spans lines when the
+# pattern is run over the whole script with re.MULTILINE.
+_MARKER_OPEN = r"^[^\S\n]*\[?[^\S\n]*"
+_MARKER_CLOSE = r"[^\S\n]*\]?:?[^\S\n]*$"
+_FIXED_MARKERS = r"(?P<both>conclusion|both|finale)|(?P<a>person[^\S\n]*a)|(?P<b>person[^\S\n]*b)"
+_GROUP_TO_SPEAKER = {
+    "both": Speaker.BOTH,
+    "a": Speaker.PERSON_A,
+    "b": Speaker.PERSON_B,
+    "name_a": Speaker.PERSON_A,
+    "name_b": Speaker.PERSON_B,
+}
+
+# Speaker name auto-detection: short letter-only lines, optionally bracketed
+# or followed by a colon, minus common section labels. Scanned over the whole
+# script with re.MULTILINE, so whitespace is horizontal only.
+_NAME_LINE_RE = re.compile(r"^[^\S\n]*(\[?(?:[A-Za-z]|[^\S\n])+\]?:?)[^\S\n]*$", re.MULTILINE)
+_NAME_PUNCT_RE = re.compile(r"[\[\]:]+")
+_NONBLANK_LINE_RE = re.compile(r"^.*\S.*$", re.MULTILINE)
+# Speakers are introduced at the top of a script; only this many non-empty
+# lines are searched for names
+_NAME_SCAN_LINES = 30
+_NON_NAME_MARKERS = frozenset(
+    {"verse", "chorus", "hook", "bridge", "intro", "outro", "conclusion", "both", "finale"}
+)
+
+# Speaker order of the padded test-mode and standard battle formats
+_THREE_SEGMENT_SPEAKERS = (Speaker.PERSON_A, Speaker.PERSON_B, Speaker.BOTH)
+_FIVE_SEGMENT_SPEAKERS = (Speaker.PERSON_A, Speaker.PERSON_B, Speaker.PERSON_A, Speaker.PERSON_B, Speaker.BOTH)
+
+
 class ShotType(Enum):
     """Type of shot in the 6-shot storyboard structure."""
     OPENING = "opening"      # Shot 1: Panning crowd, both characters, setting the scene
@@ -22,23 +56,28 @@ class ShotType(Enum):
     CLOSING = "closing"      # Shot 6: Final standoff, crowd reaction, fade out
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BattleSegment:
     """A segment of the rap battle (one turn)."""
     index: int
     speaker: Speaker
-    verses: list[str]
+    verses: tuple[str, ...]
     raw_text: str
     is_conclusion: bool = False
+    _verse_summary: str = field(init=False, repr=False, compare=False)
 
-    @property
-    def verse_summary(self) -> str:
-        """Get a brief summary of the verses for image prompting."""
+    def __post_init__(self):
+        # Segments are frozen, so the summary can be built once up front
         combined = " ".join(self.verses)
         # Truncate to first 200 chars for prompt
         if len(combined) > 200:
-            return combined[:200] + "..."
-        return combined
+            combined = combined[:200] + "..."
+        object.__setattr__(self, "_verse_summary", combined)
+
+    @property
+    def verse_summary(self) -> str:
+        """Get a brief summary of the verses for image prompting."""
+        return self._verse_summary
 
 
 def parse_rap_script(script: str, speaker_a_name: str = "", speaker_b_name: str = "") -> list[BattleSegment]:
@@ -52,138 +91,139 @@ def parse_rap_script(script: str, speaker_a_name: str = "", speaker_b_name: str
 
     Args:
         script: The rap battle script
-        speaker_a_name: Optional custom name for speaker A (auto-detected if empty)
-        speaker_b_name: Optional custom name for speaker B (auto-detected if empty)
+        speaker_a_name: Optional custom name for speaker A (auto-detected from the first
+            30 non-empty lines if empty)
+        speaker_b_name: Optional custom name for speaker B (auto-detected likewise)
 
     Returns:
         List of BattleSegment objects (typically 5: A, B, A, B, Conclusion)
     """
     segments = []
-    lines = script.strip().split("\n")
+    script = script.strip()
 
     # Auto-detect speaker names if not provided
     if not speaker_a_name or not speaker_b_name:
-        detected_names = _detect_speaker_names(lines)
+        detected_names = _detect_speaker_names(script)
         if not speaker_a_name and len(detected_names) > 0:
             speaker_a_name = detected_names[0]
         if not speaker_b_name and len(detected_names) > 1:
             speaker_b_name = detected_names[1]
 
-    current_speaker = None
-    current_verses = []
-    current_raw = []
-    segment_index = 0
-
-    def save_current_segment():
-        nonlocal current_speaker, current_verses, current_raw, segment_index
-        if current_speaker and current_verses:
-            segments.append(BattleSegment(
-                index=segment_index,
-                speaker=current_speaker,
-                verses=current_verses.copy(),
-                raw_text="\n".join(current_raw),
-                is_conclusion=(current_speaker == Speaker.BOTH),
-            ))
-            segment_index += 1
-        current_verses = []
-        current_raw = []
-
-    def check_speaker(line: str) -> Speaker | None:
-        """Check if line is a speaker marker."""
-        line_lower = line.lower().strip()
-
-        # Check for conclusion/both
-        if re.match(r"^\[?\s*(conclusion|both|finale)\s*\]?:?\s*$", line_lower):
-            return Speaker.BOTH
-
-        # Check for Person A/B
-        if re.match(r"^\[?\s*person\s*a\s*\]?:?\s*$", line_lower):
-            return Speaker.PERSON_A
-        if re.match(r"^\[?\s*person\s*b\s*\]?:?\s*$", line_lower):
-            return Speaker.PERSON_B
-
-        # Check for custom speaker names
-        if speaker_a_name:
-            pattern_a = rf"^\[?\s*{re.escape(speaker_a_name)}\s*\]?:?\s*$"
-            if re.match(pattern_a, line, re.IGNORECASE):
-                return Speaker.PERSON_A
-
-        if speaker_b_name:
-            pattern_b = rf"^\[?\s*{re.escape(speaker_b_name)}\s*\]?:?\s*$"
-            if re.match(pattern_b, line, re.IGNORECASE):
-                return Speaker.PERSON_B
-
-        return None
-
-    for line in lines:
-        line_stripped = line.strip()
-        if not line_stripped:
+    # One linear scan finds every marker; verses are the text between markers
+    markers = list(_compile_marker_re(speaker_a_name, speaker_b_name).finditer(script))
+
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(script)
+        # Strip each line once, collecting the non-empty ones
+        verses = []
+        raw_lines = []
+        for line in script[marker.end():end].split("\n"):
+            verse = line.strip()
+            if verse:
+                verses.append(verse)
+                raw_lines.append(line)
+        if not verses:
             continue
 
-        # Check for speaker markers
-        new_speaker = check_speaker(line_stripped)
-
-        if new_speaker is not None:
-            save_current_segment()
-            current_speaker = new_speaker
-        elif current_speaker:
-            # It's a verse line
-            current_verses.append(line_stripped)
-            current_raw.append(line)
-
-    # Save final segment
-    save_current_segment()
+        speaker = _GROUP_TO_SPEAKER[marker.lastgroup]
+        segments.append(BattleSegment(
+            index=len(segments),
+            speaker=speaker,
+            verses=tuple(verses),
+            raw_text="\n".join(raw_lines),
+            is_conclusion=(speaker is Speaker.BOTH),
+        ))
 
     # If no markers found, try to split by empty lines or create single segment
-    if not segments and script.strip():
+    if not segments and script:
         segments.append(BattleSegment(
             index=0,
             speaker=Speaker.PERSON_A,
-            verses=script.strip().split("\n"),
-            raw_text=script.strip(),
+            verses=tuple(script.split("\n")),
+            raw_text=script,
             is_conclusion=False,
         ))
 
     return segments
 
 
-def _detect_speaker_names(lines: list[str]) -> list[str]:
+@functools.lru_cache(maxsize=64)
+def _compile_marker_re(speaker_a_name: str, speaker_b_name: str) -> re.Pattern:
+    """
+    Compile a multiline pattern matching every speaker marker line in a script.
+
+    The fixed markers come first so they win over custom names, and the named
+    group that matched identifies the speaker (see _GROUP_TO_SPEAKER). Cached
+    per name pair since the same battlers are parsed repeatedly.
+    """
+    alternatives = [_FIXED_MARKERS]
+    if speaker_a_name:
+        alternatives.append(rf"(?P<name_a>{re.escape(speaker_a_name)})")
+    if speaker_b_name:
+        alternatives.append(rf"(?P<name_b>{re.escape(speaker_b_name)})")
+
+    return re.compile(
+        _MARKER_OPEN + "(?:" + "|".join(alternatives) + ")" + _MARKER_CLOSE,
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+def _detect_speaker_names(script: str) -> list[str]:
     """
     Auto-detect speaker names from script.
     Looks for lines that appear to be speaker markers (short lines, possibly with brackets/colons).
+    Candidate lines are found lazily, so the scan stops as soon as two names are known,
+    and only the first _NAME_SCAN_LINES non-empty lines are searched.
     """
     potential_speakers = []
+    seen = set()
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+    # End of the window of leading non-empty lines that may introduce speakers
+    scan_end = len(script)
+    for count, line_match in enumerate(_NONBLANK_LINE_RE.finditer(script), 1):
+        if count == _NAME_SCAN_LINES:
+            scan_end = line_match.end()
+            break
+
+    for match in _NAME_LINE_RE.finditer(script, 0, scan_end):
+        line = match.group(1).strip()
 
         # Skip if too long (likely a verse, not a name)
         if len(line) > 50:
             continue
 
-        # Check if it looks like a speaker marker
-        # Short line, possibly with brackets or colon
-        if re.match(r"^\[?[A-Za-z\s]+\]?:?\s*$", line):
-            # Clean the name
-            name = re.sub(r"[\[\]:]+", "", line).strip()
+        # Clean the name
+        name = _NAME_PUNCT_RE.sub("", line).strip()
 
-            # Skip common non-name markers
-            skip_words = ["verse", "chorus", "hook", "bridge", "intro", "outro", "conclusion", "both", "finale"]
-            if name.lower() in skip_words:
-                continue
+        # Skip common non-name markers
+        if name.lower() in _NON_NAME_MARKERS:
+            continue
 
-            if name and name not in potential_speakers:
-                potential_speakers.append(name)
+        if name and name not in seen:
+            seen.add(name)
+            potential_speakers.append(name)
 
-            # Stop after finding 2 unique speakers
-            if len(potential_speakers) >= 2:
-                break
+        # Stop after finding 2 unique speakers
+        if len(potential_speakers) >= 2:
+            break
 
     return potential_speakers
 
 
+def _placeholder_segments(speakers: tuple[Speaker, ...]) -> tuple[BattleSegment, ...]:
+    """Build the "..." segments used to pad a short script to a fixed format."""
+    last = len(speakers) - 1
+    return tuple(
+        BattleSegment(index=i, speaker=speaker, verses=("...",), raw_text="...", is_conclusion=(i == last))
+        for i, speaker in enumerate(speakers)
+    )
+
+
+# Segments are frozen, so the padding placeholders are built once and shared
+_PAD_THREE = _placeholder_segments(_THREE_SEGMENT_SPEAKERS)
+_PAD_FIVE = _placeholder_segments(_FIVE_SEGMENT_SPEAKERS)
+
+
 def ensure_three_segments(segments: list[BattleSegment]) -> list[BattleSegment]:
     """
     Ensure we have exactly 3 segments for test mode: A, B, Conclusion.
@@ -192,31 +232,22 @@ def ensure_three_segments(segments: list[BattleSegment]) -> list[BattleSegment]:
         # Take first 2 and make 3rd the conclusion
         result = segments[:2]
         if len(segments) >= 3:
-            conclusion = segments[2] if segments[2].speaker == Speaker.BOTH else BattleSegment(
+            conclusion = segments[2] if segments[2].speaker is Speaker.BOTH else BattleSegment(
                 index=2,
                 speaker=Speaker.BOTH,
-                verses=segments[2].verses if len(segments) > 2 else ["..."],
+                verses=segments[2].verses if len(segments) > 2 else ("...",),
                 raw_text=segments[2].raw_text if len(segments) > 2 else "...",
                 is_conclusion=True,
             )
         else:
             conclusion = BattleSegment(
-                index=2, speaker=Speaker.BOTH, verses=["..."], raw_text="...", is_conclusion=True
+                index=2, speaker=Speaker.BOTH, verses=("...",), raw_text="...", is_conclusion=True
             )
-        conclusion.index = 2
-        conclusion.is_conclusion = True
-        result.append(conclusion)
+        result.append(replace(conclusion, index=2, is_conclusion=True))
         return result
 
     # Pad if less than 3
-    expected = [Speaker.PERSON_A, Speaker.PERSON_B, Speaker.BOTH]
-    result = segments.copy()
-    while len(result) < 3:
-        idx = len(result)
-        result.append(BattleSegment(
-            index=idx, speaker=expected[idx], verses=["..."], raw_text="...", is_conclusion=(idx == 2)
-        ))
-    return result
+    return [*segments, *_PAD_THREE[len(segments):]]
 
 
 def ensure_five_segments(segments: list[BattleSegment]) -> list[BattleSegment]:
@@ -231,37 +262,48 @@ def ensure_five_segments(segments: list[BattleSegment]) -> list[BattleSegment]:
 
     if len(segments) < 5:
         # Pad with empty segments
-        expected_speakers = [Speaker.PERSON_A, Speaker.PERSON_B, Speaker.PERSON_A, Speaker.PERSON_B, Speaker.BOTH]
-        result = segments.copy()
-        while len(result) < 5:
-            idx = len(result)
-            result.append(BattleSegment(
-                index=idx,
-                speaker=expected_speakers[idx],
-                verses=["..."],
-                raw_text="...",
-                is_conclusion=(idx == 4),
-            ))
-        return result
+        return [*segments, *_PAD_FIVE[len(segments):]]
 
     # More than 5 - keep first 4 and merge rest into conclusion
     result = segments[:4]
-    conclusion_verses = []
-    conclusion_raw = []
-    for seg in segments[4:]:
-        conclusion_verses.extend(seg.verses)
-        conclusion_raw.append(seg.raw_text)
+    tail = segments[4:]
     result.append(BattleSegment(
         index=4,
         speaker=Speaker.BOTH,
-        verses=conclusion_verses,
-        raw_text="\n".join(conclusion_raw),
+        verses=tuple(verse for seg in tail for verse in seg.verses),
+        raw_text="\n".join(seg.raw_text for seg in tail),
         is_conclusion=True,
     ))
     return result
 
 
-@dataclass
+def parse_and_ensure_segments(
+    script: str,
+    count: int,
+    speaker_a_name: str = "",
+    speaker_b_name: str = "",
+) -> list[BattleSegment]:
+    """
+    Parse a script straight into the fixed battle format.
+
+    Args:
+        script: The rap battle script
+        count: Number of segments to produce: 3 (test mode) or 5 (full battle)
+        speaker_a_name: Optional custom name for speaker A
+        speaker_b_name: Optional custom name for speaker B
+
+    Returns:
+        Exactly `count` BattleSegment objects, padded or merged as needed
+    """
+    if count not in _ENSURE_BY_COUNT:
+        raise ValueError(f"Unsupported segment count: {count} (expected 3 or 5)")
+    return _ENSURE_BY_COUNT[count](parse_rap_script(script, speaker_a_name, speaker_b_name))
+
+
+_ENSURE_BY_COUNT = {3: ensure_three_segments, 5: ensure_five_segments}
+
+
+@dataclass(slots=True, frozen=True)
 class StoryboardShot:
     """
     A single shot in the 6-shot storyboard structure.
@@ -279,18 +321,28 @@ class StoryboardShot:
     @property
     def needs_lipsync(self) -> bool:
         """Whether this shot needs lip sync (verse shots only)."""
-        return self.shot_type == ShotType.VERSE or self.shot_type == ShotType.REACTION
-
-
-# Camera directions for each of the 6 shots
-SHOT_CAMERA_DIRECTIONS = {
-    0: "Cinematic crane shot panning across crowd, revealing both performers on stage, building anticipation, slow zoom toward center stage",
-    1: "Low-angle push-in, performer spreads arms wide then points at camera, dramatic rim lighting, passionate delivery",
-    2: "Dutch angle tracking shot, performer walks into frame with swagger, confident gestures, stylish cross-lighting",
-    3: "Medium shot showing both performers, focus on speaker delivering bars while opponent visible reacting in background, tension building",
-    4: "Dynamic arc shot around performer, quick cut showing opponent's surprised reaction, then back to triumphant delivery",
-    5: "Epic wide crane pullback, both performers step toward center, crowd erupting, confetti falling, triumphant finale",
-}
+        return self.shot_type is ShotType.VERSE or self.shot_type is ShotType.REACTION
+
+
+# Camera directions for each of the 6 shots, indexed by shot
+SHOT_CAMERA_DIRECTIONS = (
+    "Cinematic crane shot panning across crowd, revealing both performers on stage, building anticipation, slow zoom toward center stage",
+    "Low-angle push-in, performer spreads arms wide then points at camera, dramatic rim lighting, passionate delivery",
+    "Dutch angle tracking shot, performer walks into frame with swagger, confident gestures, stylish cross-lighting",
+    "Medium shot showing both performers, focus on speaker delivering bars while opponent visible reacting in background, tension building",
+    "Dynamic arc shot around performer, quick cut showing opponent's surprised reaction, then back to triumphant delivery",
+    "Epic wide crane pullback, both performers step toward center, crowd erupting, confetti falling, triumphant finale",
+)
+
+# Shot layout: (index, shot_type, primary_speaker, show_reaction, verse_index, audio_source)
+_SHOT_SPECS = (
+    (0, ShotType.OPENING, Speaker.BOTH, False, None, "intro"),         # Opening
+    (1, ShotType.VERSE, Speaker.PERSON_A, False, 0, "verse_0"),        # Verse 1 - Person A
+    (2, ShotType.VERSE, Speaker.PERSON_B, False, 1, "verse_1"),        # Verse 2 - Person B
+    (3, ShotType.REACTION, Speaker.PERSON_A, True, 2, "verse_2"),      # Verse 3 - A with B reacting in frame
+    (4, ShotType.REACTION, Speaker.PERSON_B, True, 3, "verse_3"),      # Verse 4 - B with quick cuts to A
+    (5, ShotType.CLOSING, Speaker.BOTH, False, None, "outro"),         # Closing
+)
 
 
 def create_storyboard_shots(segments: list[BattleSegment]) -> list[StoryboardShot]:
@@ -312,81 +364,20 @@ def create_storyboard_shots(segments: list[BattleSegment]) -> list[StoryboardSho
         List of 6 StoryboardShot objects
     """
     shots = []
-
-    # Shot 0: Opening
-    shots.append(StoryboardShot(
-        index=0,
-        shot_type=ShotType.OPENING,
-        primary_speaker=Speaker.BOTH,
-        show_reaction=False,
-        verse_index=None,
-        camera_direction=SHOT_CAMERA_DIRECTIONS[0],
-        audio_source="intro",
-        verse_text="",
-    ))
-
-    # Shot 1: Verse 1 - Person A
-    verse_1_text = segments[0].verse_summary if len(segments) > 0 else ""
-    shots.append(StoryboardShot(
-        index=1,
-        shot_type=ShotType.VERSE,
-        primary_speaker=Speaker.PERSON_A,
-        show_reaction=False,
-        verse_index=0,
-        camera_direction=SHOT_CAMERA_DIRECTIONS[1],
-        audio_source="verse_0",
-        verse_text=verse_1_text,
-    ))
-
-    # Shot 2: Verse 2 - Person B
-    verse_2_text = segments[1].verse_summary if len(segments) > 1 else ""
-    shots.append(StoryboardShot(
-        index=2,
-        shot_type=ShotType.VERSE,
-        primary_speaker=Speaker.PERSON_B,
-        show_reaction=False,
-        verse_index=1,
-        camera_direction=SHOT_CAMERA_DIRECTIONS[2],
-        audio_source="verse_1",
-        verse_text=verse_2_text,
-    ))
-
-    # Shot 3: Verse 3 - Person A with B reaction (both in frame)
-    verse_3_text = segments[2].verse_summary if len(segments) > 2 else ""
-    shots.append(StoryboardShot(
-        index=3,
-        shot_type=ShotType.REACTION,
-        primary_speaker=Speaker.PERSON_A,
-        show_reaction=True,  # Show Person B reacting
-        verse_index=2,
-        camera_direction=SHOT_CAMERA_DIRECTIONS[3],
-        audio_source="verse_2",
-        verse_text=verse_3_text,
-    ))
-
-    # Shot 4: Verse 4 - Person B with quick cut to A reaction
-    verse_4_text = segments[3].verse_summary if len(segments) > 3 else ""
-    shots.append(StoryboardShot(
-        index=4,
-        shot_type=ShotType.REACTION,
-        primary_speaker=Speaker.PERSON_B,
-        show_reaction=True,  # Show Person A reacting with quick cuts
-        verse_index=3,
-        camera_direction=SHOT_CAMERA_DIRECTIONS[4],
-        audio_source="verse_3",
-        verse_text=verse_4_text,
-    ))
-
-    # Shot 5: Closing
-    shots.append(StoryboardShot(
-        index=5,
-        shot_type=ShotType.CLOSING,
-        primary_speaker=Speaker.BOTH,
-        show_reaction=False,
-        verse_index=None,
-        camera_direction=SHOT_CAMERA_DIRECTIONS[5],
-        audio_source="outro",
-        verse_text="",
-    ))
+    for index, shot_type, primary_speaker, show_reaction, verse_index, audio_source in _SHOT_SPECS:
+        verse_text = ""
+        if verse_index is not None and verse_index < len(segments):
+            verse_text = segments[verse_index].verse_summary
+
+        shots.append(StoryboardShot(
+            index=index,
+            shot_type=shot_type,
+            primary_speaker=primary_speaker,
+            show_reaction=show_reaction,
+            verse_index=verse_index,
+            camera_direction=SHOT_CAMERA_DIRECTIONS[index],
+            audio_source=audio_source,
+            verse_text=verse_text,
+        ))
 
     return shots
@@ -16,15 +16,24 @@ Legacy Pipeline (5 segments):
 5. Compose all videos with continuous beat track
 """
 
+import functools
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 from dataclasses import dataclass, field
 
 from pydub import AudioSegment
 
+from app_gradio_fastapi.helpers.disk_cache import prune_lru, touch
 from app_gradio_fastapi.services.script_parser import (
     parse_rap_script,
-    ensure_five_segments,
-    ensure_three_segments,
+    parse_and_ensure_segments,
     BattleSegment,
     Speaker,
     ShotType,
@@ -32,17 +41,24 @@ from app_gradio_fastapi.services.script_parser import (
     create_storyboard_shots,
 )
 from app_gradio_fastapi.services.grok_image_api import (
+    OUTPUTS_DIR as STORYBOARD_DIR,
+    IMAGE_CONCURRENCY,
     generate_all_storyboards,
     edit_all_storyboards,
     generate_environment_reference,
+    generate_storyboard_image,
+    build_storyboard_prompt,
+    edit_storyboard_image,
+    build_edit_prompt,
 )
 from app_gradio_fastapi.services.runway_api import (
     generate_all_videos,
     generate_6shot_videos,
 )
 from app_gradio_fastapi.services.sync_labs_api import (
-    upload_files_for_lipsync,
-    lipsync_all_segments,
+    OUTPUTS_DIR as LIPSYNC_DIR,
+    upload_to_temp_host,
+    lipsync_video,
 )
 from app_gradio_fastapi.services.video_composer import (
     compose_battle_video,
@@ -52,8 +68,46 @@ from app_gradio_fastapi.services.video_composer import (
     split_audio_into_segments,
 )
 
+# Max concurrent temp-hosting uploads while Runway is still rendering
+UPLOAD_CONCURRENCY = 4
 
-@dataclass
+# Content-addressed storyboard images, reused across 6-shot runs; trimmed to
+# IMAGE_CACHE_MAX_BYTES, least recently used first
+IMAGE_CACHE_DIR = STORYBOARD_DIR / "image_cache"
+IMAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _video_theme(video_style: str, location: str) -> str:
+    """Theme string passed to Runway prompts by both pipelines."""
+    return f"{video_style} style, {location}"
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_cached(
+    script: str,
+    speaker_a_name: str,
+    speaker_b_name: str,
+    count: int | None,
+) -> tuple[BattleSegment, ...]:
+    """
+    Parse (and pad) a script once per input, so re-runs that only change
+    style, location or audio skip the parse.
+
+    Args:
+        script: The rap battle script
+        speaker_a_name: Name of speaker A as it appears in script
+        speaker_b_name: Name of speaker B as it appears in script
+        count: Fixed segment count (3 or 5), or None to keep the parsed segments as-is
+
+    Returns:
+        Tuple of segments; callers copy it into a list before modifying
+    """
+    if count is None:
+        return tuple(parse_rap_script(script, speaker_a_name, speaker_b_name))
+    return tuple(parse_and_ensure_segments(script, count, speaker_a_name, speaker_b_name))
+
+
+@dataclass(slots=True)
 class PipelineResult:
     """Result of the storyboard pipeline."""
     success: bool
@@ -65,7 +119,7 @@ class PipelineResult:
     status_messages: list[str] = field(default_factory=list)
 
 
-def run_storyboard_pipeline(
+def iter_storyboard_pipeline(
     script: str,
     video_style: str,
     location: str,
@@ -80,9 +134,13 @@ def run_storyboard_pipeline(
     skip_video_generation: bool = False,
     enable_lipsync: bool = False,
     test_mode: bool = False,
-) -> PipelineResult:
+) -> Iterator[PipelineResult]:
     """
-    Run the full storyboard pipeline.
+    Run the full storyboard pipeline, yielding a snapshot after each stage.
+
+    Snapshots let a UI show storyboards and raw videos while the later
+    stages run. Intermediate snapshots have no final_video; the last one
+    yielded is the final result.
 
     Args:
         script: The rap battle script with speaker name markers
@@ -100,8 +158,8 @@ def run_storyboard_pipeline(
         enable_lipsync: If True, use Sync Labs for lip sync (requires URL hosting)
         test_mode: If True, only generate 3 segments (A, B, conclusion) to save credits
 
-    Returns:
-        PipelineResult with all outputs and status
+    Yields:
+        PipelineResult snapshots, ending with the final outputs and status
     """
     status_messages = []
 
@@ -109,13 +167,30 @@ def run_storyboard_pipeline(
     expected_clips = 2 if test_mode else 4
     if len(audio_clips) != expected_clips:
         status_messages.append(f"Error: Expected {expected_clips} audio clips, got {len(audio_clips)}")
-        return PipelineResult(
+        yield PipelineResult(
             success=False,
             segments=[],
             storyboard_images=[],
             video_segments=[],
             status_messages=status_messages,
         )
+        return
+
+    # Cheap precondition checks before spending anything on Grok/Runway
+    missing_clips = [clip for clip in audio_clips if not Path(clip).exists()]
+    if missing_clips:
+        status_messages.append(f"Error: Audio clips not found: {', '.join(missing_clips)}")
+    if not script.strip():
+        status_messages.append("Error: Script is empty")
+    if missing_clips or not script.strip():
+        yield PipelineResult(
+            success=False,
+            segments=[],
+            storyboard_images=[],
+            video_segments=[],
+            status_messages=status_messages,
+        )
+        return
 
     # Step 1: Parse the script
     status_messages.append("Parsing rap script...")
@@ -123,8 +198,7 @@ def run_storyboard_pipeline(
         status_messages.append("TEST MODE: Only generating 3 segments (A, B, Conclusion)")
     if speaker_a_name or speaker_b_name:
         status_messages.append(f"Speaker names: {speaker_a_name or 'auto'} vs {speaker_b_name or 'auto'}")
-    segments = parse_rap_script(script, speaker_a_name, speaker_b_name)
-    segments = ensure_three_segments(segments) if test_mode else ensure_five_segments(segments)
+    segments = list(_parse_cached(script, speaker_a_name, speaker_b_name, 3 if test_mode else 5))
     status_messages.append(f"Parsed {len(segments)} segments")
 
     for seg in segments:
@@ -135,7 +209,7 @@ def run_storyboard_pipeline(
     use_reference_photos = speaker_a_image and speaker_b_image
 
     # Build theme string for video generation (used by Runway)
-    theme = f"{video_style} style, {location}"
+    theme = _video_theme(video_style, location)
 
     if use_reference_photos:
         status_messages.append("Generating storyboards from reference photos (Edit API)...")
@@ -158,78 +232,90 @@ def run_storyboard_pipeline(
     status_messages.append(img_status)
 
     if len(storyboard_images) != len(segments):
-        return PipelineResult(
+        yield PipelineResult(
             success=False,
             segments=segments,
             storyboard_images=storyboard_images,
             video_segments=[],
             status_messages=status_messages,
         )
+        return
 
     if skip_video_generation:
         status_messages.append("Skipping video generation (test mode)")
-        return PipelineResult(
+        yield PipelineResult(
             success=True,
             segments=segments,
             storyboard_images=storyboard_images,
             video_segments=[],
             status_messages=status_messages,
         )
+        return
+
+    yield PipelineResult(
+        success=True,
+        segments=segments,
+        storyboard_images=storyboard_images,
+        video_segments=[],
+        status_messages=list(status_messages),
+    )
 
     # Step 3: Generate videos from storyboards
     status_messages.append("Generating videos from storyboards with Runway...")
     speakers = [seg.speaker.value for seg in segments]
-    video_segments, vid_status = generate_all_videos(
-        image_paths=storyboard_images,
-        theme=theme,
-        speakers=speakers,
-    )
+    if enable_lipsync:
+        # Lip sync for Step 4 starts per segment while Runway is still rendering
+        status_messages.append("Lip syncing each video with Sync Labs as it finishes...")
+        video_segments, vid_status, lipsync_futures = _generate_videos_with_lipsync(
+            image_paths=storyboard_images,
+            theme=theme,
+            speakers=speakers,
+            audio_clips=audio_clips,
+        )
+    else:
+        video_segments, vid_status = generate_all_videos(
+            image_paths=storyboard_images,
+            theme=theme,
+            speakers=speakers,
+        )
     status_messages.append(vid_status)
 
     if len(video_segments) != len(segments):
-        return PipelineResult(
+        yield PipelineResult(
             success=False,
             segments=segments,
             storyboard_images=storyboard_images,
             video_segments=video_segments,
             status_messages=status_messages,
         )
+        return
 
-    # Step 4: Lip sync with Sync Labs
+    yield PipelineResult(
+        success=True,
+        segments=segments,
+        storyboard_images=storyboard_images,
+        video_segments=video_segments,
+        status_messages=list(status_messages),
+    )
+
+    # Step 4: Lip sync with Sync Labs (started per segment in Step 3)
     lipsynced_videos = []
     if enable_lipsync:
-        status_messages.append("Uploading files for lip sync...")
-
-        # Only lip sync the non-conclusion videos (first N-1 segments)
-        videos_to_sync = video_segments[:-1]  # All except conclusion
-        audios_to_sync = audio_clips  # All audio clips
-
-        # Upload to temp hosting
-        video_urls, audio_urls, upload_status = upload_files_for_lipsync(
-            video_paths=videos_to_sync,
-            audio_paths=audios_to_sync,
-        )
-        status_messages.append(upload_status)
-
-        if len(video_urls) != len(videos_to_sync) or len(audio_urls) != len(audios_to_sync):
-            status_messages.append("Upload failed - falling back to audio overlay")
-            lipsynced_videos = video_segments
+        synced_paths = []
+        for i, future in enumerate(lipsync_futures):
+            synced_path, status = future.result()
+            if synced_path is None:
+                status_messages.append(f"Failed at segment {i}: {status}")
+                break
+            synced_paths.append(synced_path)
+
+        if len(synced_paths) == len(video_segments) - 1:
+            # Add conclusion video (no lip sync needed)
+            lipsynced_videos = synced_paths + [video_segments[-1]]
+            status_messages.append(f"Lip synced {len(synced_paths)} segments")
         else:
-            # Run lip sync
-            status_messages.append("Running lip sync with Sync Labs...")
-            synced_paths, sync_status = lipsync_all_segments(
-                video_urls=video_urls,
-                audio_urls=audio_urls,
-            )
-            status_messages.append(sync_status)
-
-            if len(synced_paths) == len(videos_to_sync):
-                # Add conclusion video (no lip sync needed)
-                lipsynced_videos = synced_paths + [video_segments[-1]]
-                status_messages.append(f"Lip synced {len(synced_paths)} segments")
-            else:
-                status_messages.append("Lip sync failed - falling back to audio overlay")
-                lipsynced_videos = video_segments
+            status_messages.append("Lip sync failed - falling back to audio overlay")
+            lipsynced_videos = video_segments
     else:
         lipsynced_videos = video_segments
 
@@ -245,7 +331,7 @@ def run_storyboard_pipeline(
 
     status_messages.append(compose_status)
 
-    return PipelineResult(
+    yield PipelineResult(
         success=(final_video is not None),
         segments=segments,
         storyboard_images=storyboard_images,
@@ -256,6 +342,96 @@ def run_storyboard_pipeline(
     )
 
 
+def run_storyboard_pipeline(*args, **kwargs) -> PipelineResult:
+    """
+    Run the full storyboard pipeline and return only the final result.
+
+    Takes the same arguments as iter_storyboard_pipeline.
+    """
+    return _last(iter_storyboard_pipeline(*args, **kwargs))
+
+
+def _last(snapshots: Iterator):
+    """Exhaust a pipeline generator and return its final snapshot."""
+    result = None
+    for result in snapshots:
+        pass
+    return result
+
+
+def _generate_videos_with_lipsync(
+    image_paths: list[str],
+    theme: str,
+    speakers: list[str],
+    audio_clips: list[str],
+) -> tuple[list[str], str, list[Future]]:
+    """
+    Generate Runway videos and start each segment's lip sync as soon as its video lands.
+
+    Audio clips are uploaded straight away. Every non-conclusion video is
+    uploaded and sent to Sync Labs the moment Runway delivers it, so one
+    segment's lip sync overlaps the rendering of the others instead of
+    waiting for the whole batch.
+
+    Args:
+        image_paths: Storyboard image paths, one per segment
+        theme: Visual theme for the video prompts
+        speakers: Speaker name for each segment
+        audio_clips: Vocal clips to lip sync against, one per non-conclusion segment
+
+    Returns:
+        Tuple of (video_paths, video_status, lipsync_futures). Each future
+        resolves to (lipsynced_path, status) in segment order; the list is
+        empty if video generation failed.
+    """
+    num_to_sync = len(image_paths) - 1  # The conclusion isn't lip synced
+    # Audio uploads are queued first, so chains waiting on them never starve the pool
+    executor = ThreadPoolExecutor(max_workers=max(UPLOAD_CONCURRENCY, num_to_sync))
+    audio_uploads = [executor.submit(upload_to_temp_host, path) for path in audio_clips]
+    pending: dict[int, Future] = {}
+    # Set when the Runway batch fails, so no chain starts a paid Sync Labs job for nothing
+    batch_failed = threading.Event()
+
+    def upload_and_sync(index: int, video_path: str) -> tuple[str | None, str]:
+        if batch_failed.is_set():
+            return None, f"Lip sync {index} skipped: video generation failed"
+        video_url, status = upload_to_temp_host(video_path)
+        if video_url is None:
+            return None, f"Failed to upload video {index}: {status}"
+        audio_url, status = audio_uploads[index].result()
+        if audio_url is None:
+            return None, f"Failed to upload audio {index}: {status}"
+        if batch_failed.is_set():
+            return None, f"Lip sync {index} skipped: video generation failed"
+        return lipsync_video(
+            video_path=video_url,
+            audio_path=audio_url,
+            output_path=LIPSYNC_DIR / f"segment_{index}_lipsynced.mp4",
+            sync_mode="cut_off",
+        )
+
+    def start_lipsync(index: int, video_path: str) -> None:
+        if index < num_to_sync:
+            pending[index] = executor.submit(upload_and_sync, index, video_path)
+
+    video_paths, vid_status = generate_all_videos(
+        image_paths=image_paths,
+        theme=theme,
+        speakers=speakers,
+        on_video_ready=start_lipsync,
+    )
+
+    if len(video_paths) != len(image_paths):
+        # Nothing will be lip synced: drop queued work, stop running chains before they
+        # submit a job, and wait for jobs already submitted rather than orphaning them
+        batch_failed.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        return video_paths, vid_status, []
+
+    executor.shutdown(wait=False)  # Queued lip syncs keep running; callers wait on the futures
+    return video_paths, vid_status, [pending[i] for i in range(num_to_sync)]
+
+
 def run_storyboard_only(
     script: str,
     video_style: str,
@@ -284,8 +460,7 @@ def run_storyboard_only(
     """
     status_messages = []
 
-    segments = parse_rap_script(script)
-    segments = ensure_five_segments(segments)
+    segments = list(_parse_cached(script, "", "", 5))
     status_messages.append(f"Parsed {len(segments)} segments")
 
     # Use edit mode if reference photos provided
@@ -321,10 +496,32 @@ def run_storyboard_only(
 OUTPUTS_DIR = Path("outputs")
 
 
+def _beat_slice_path(kind: str, beat_path: str, duration: float) -> Path:
+    """Cache path for an intro/outro slice, keyed by the beat file version and slice length."""
+    stat = os.stat(beat_path)
+    key = f"{os.path.abspath(beat_path)}|{stat.st_mtime_ns}|{stat.st_size}|{duration}".encode()
+    return OUTPUTS_DIR / f"beat_{kind}_{hashlib.blake2b(key, digest_size=8).hexdigest()}.wav"
+
+
+def _export_atomic(audio: AudioSegment, output_path: Path) -> None:
+    """
+    Export a slice as WAV under a temp name and rename it so a cached slice is never partial.
+
+    These slices are only read back by the composer, so uncompressed PCM
+    skips an MP3 encode here and a lossy re-decode there.
+    """
+    tmp_path = output_path.with_suffix(f".{os.getpid()}.tmp")
+    audio.export(str(tmp_path), format="wav")
+    os.replace(tmp_path, output_path)
+
+
 def extract_beat_intro(beat_path: str, duration: float = 5.0) -> tuple[str | None, str]:
     """
     Extract the first N seconds of beat for the opening shot.
 
+    Slices are cached per beat version and duration, so repeat runs with
+    the same beat skip decoding entirely.
+
     Args:
         beat_path: Path to the beat audio file
         duration: Duration in seconds to extract
@@ -333,12 +530,15 @@ def extract_beat_intro(beat_path: str, duration: float = 5.0) -> tuple[str | Non
         Tuple of (extracted_path, status_message)
     """
     try:
+        output_path = _beat_slice_path("intro", beat_path, duration)
+        if output_path.exists():
+            return str(output_path), f"Using cached {duration}s intro from beat"
+
         audio = AudioSegment.from_file(beat_path)
         intro = audio[: int(duration * 1000)]  # pydub works in milliseconds
 
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
-        output_path = OUTPUTS_DIR / "beat_intro.mp3"
-        intro.export(str(output_path), format="mp3")
+        _export_atomic(intro, output_path)
 
         return str(output_path), f"Extracted {duration}s intro from beat"
     except Exception as e:
@@ -349,6 +549,8 @@ def extract_beat_outro(beat_path: str, duration: float = 5.0) -> tuple[str | Non
     """
     Extract the last N seconds of beat for the closing shot.
 
+    Slices are cached per beat version and duration, like the intro.
+
     Args:
         beat_path: Path to the beat audio file
         duration: Duration in seconds to extract
@@ -357,23 +559,78 @@ def extract_beat_outro(beat_path: str, duration: float = 5.0) -> tuple[str | Non
         Tuple of (extracted_path, status_message)
     """
     try:
+        output_path = _beat_slice_path("outro", beat_path, duration)
+        if output_path.exists():
+            return str(output_path), f"Using cached {duration}s outro from beat"
+
         audio = AudioSegment.from_file(beat_path)
         outro = audio[-int(duration * 1000):]  # Last N seconds
 
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
-        output_path = OUTPUTS_DIR / "beat_outro.mp3"
-        outro.export(str(output_path), format="mp3")
+        _export_atomic(outro, output_path)
 
         return str(output_path), f"Extracted {duration}s outro from beat"
     except Exception as e:
         return None, f"Error extracting beat outro: {e}"
 
 
+def extract_beat_intro_outro(
+    beat_path: str,
+    intro_duration: float = 5.0,
+    outro_duration: float = 5.0,
+) -> tuple[str | None, str | None, str]:
+    """
+    Extract both the intro and outro slices from a single decode of the beat.
+
+    Cached slices are reused as in extract_beat_intro/extract_beat_outro;
+    the beat is only decoded if at least one slice is missing, and missing
+    slices are exported in parallel.
+
+    Args:
+        beat_path: Path to the beat audio file
+        intro_duration: Seconds to take from the start
+        outro_duration: Seconds to take from the end
+
+    Returns:
+        Tuple of (intro_path, outro_path, status_message)
+    """
+    try:
+        intro_path = _beat_slice_path("intro", beat_path, intro_duration)
+        outro_path = _beat_slice_path("outro", beat_path, outro_duration)
+
+        missing = [path for path in (intro_path, outro_path) if not path.exists()]
+        if missing:
+            audio = AudioSegment.from_file(beat_path)
+            slices = {
+                intro_path: audio[: int(intro_duration * 1000)],  # pydub works in milliseconds
+                outro_path: audio[-int(outro_duration * 1000):],
+            }
+
+            OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                list(executor.map(lambda path: _export_atomic(slices[path], path), missing))
+
+        return str(intro_path), str(outro_path), f"Extracted {intro_duration}s intro and {outro_duration}s outro from beat"
+    except Exception as e:
+        return None, None, f"Error extracting beat intro/outro: {e}"
+
+
 def get_audio_duration(audio_path: str) -> float:
     """Get the duration of an audio file in seconds."""
     try:
-        audio = AudioSegment.from_file(audio_path)
-        return len(audio) / 1000.0  # Convert ms to seconds
+        # ffprobe reads the container header instead of decoding the whole file
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                audio_path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        return float(result.stdout.strip())
     except Exception:
         return 10.0  # Default duration if we can't read the file
 
@@ -383,7 +640,7 @@ def get_audio_duration(audio_path: str) -> float:
 # ============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class SixShotPipelineResult:
     """Result of the 6-shot storyboard pipeline."""
     success: bool
@@ -395,7 +652,35 @@ class SixShotPipelineResult:
     status_messages: list[str] = field(default_factory=list)
 
 
-def run_6shot_pipeline(
+def _image_cache_key(prompt: str, video_style: str, ref_image: str | None) -> str:
+    """Hash everything that determines a storyboard image: prompt, style and reference photo bytes."""
+    ref_digest = ""
+    if ref_image:
+        stat = os.stat(ref_image)
+        ref_digest = _file_digest(os.path.abspath(ref_image), stat.st_mtime_ns, stat.st_size)
+    return hashlib.sha256(f"{prompt}|{video_style}|{ref_digest}".encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=8)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """SHA-256 of one version of a file, so a reference photo shared by several shots is hashed once."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _store_cached_image(image_path: str, cache_path: Path) -> None:
+    """Copy a fresh image into the cache; best effort, renamed into place so readers never see a partial file."""
+    try:
+        IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=IMAGE_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp_file, open(image_path, "rb") as src:
+            shutil.copyfileobj(src, tmp_file)
+        os.replace(tmp_path, cache_path)
+        prune_lru(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, "*.png")
+    except OSError:
+        pass
+
+
+def iter_6shot_pipeline(
     script: str,
     video_style: str,
     location: str,
@@ -411,9 +696,13 @@ def run_6shot_pipeline(
     enable_lipsync: bool = True,
     intro_duration: float = 5.0,
     outro_duration: float = 5.0,
-) -> SixShotPipelineResult:
+    refresh_images: bool = False,
+) -> Iterator[SixShotPipelineResult]:
     """
-    Run the 6-shot storyboard pipeline.
+    Run the 6-shot storyboard pipeline, yielding a snapshot after each stage.
+
+    As with iter_storyboard_pipeline, intermediate snapshots have no
+    final_video and the last one yielded is the final result.
 
     Creates 6 videos:
     - Shot 0: Opening (panning crowd, both characters)
@@ -436,16 +725,18 @@ def run_6shot_pipeline(
         enable_lipsync: Whether to use Act-Two for lip sync
         intro_duration: Duration of opening shot in seconds
         outro_duration: Duration of closing shot in seconds
+        refresh_images: Re-render every storyboard image instead of reusing a
+            cached one (the new image still replaces the cache entry)
 
-    Returns:
-        SixShotPipelineResult with all outputs
+    Yields:
+        SixShotPipelineResult snapshots, ending with all outputs
     """
     status_messages = []
 
     # Validate audio clips - need exactly 4 for verses
     if len(audio_clips) != 4:
         status_messages.append(f"Error: Expected 4 audio clips for verses, got {len(audio_clips)}")
-        return SixShotPipelineResult(
+        yield SixShotPipelineResult(
             success=False,
             shots=[],
             environment_image=None,
@@ -454,22 +745,18 @@ def run_6shot_pipeline(
             final_video=None,
             status_messages=status_messages,
         )
+        return
 
     # Step 1: Parse the script
     status_messages.append("Parsing rap script...")
-    segments = parse_rap_script(script, speaker_a_name, speaker_b_name)
+    segments = list(_parse_cached(script, speaker_a_name, speaker_b_name, None))
 
     # Ensure we have at least 4 segments for the 4 verses
-    while len(segments) < 4:
-        idx = len(segments)
-        expected = [Speaker.PERSON_A, Speaker.PERSON_B, Speaker.PERSON_A, Speaker.PERSON_B]
-        segments.append(BattleSegment(
-            index=idx,
-            speaker=expected[idx] if idx < 4 else Speaker.BOTH,
-            verses=["..."],
-            raw_text="...",
-            is_conclusion=False,
-        ))
+    expected = [Speaker.PERSON_A, Speaker.PERSON_B, Speaker.PERSON_A, Speaker.PERSON_B]
+    segments.extend(
+        BattleSegment(index=i, speaker=expected[i], verses=("...",), raw_text="...", is_conclusion=False)
+        for i in range(len(segments), 4)
+    )
 
     status_messages.append(f"Parsed {len(segments)} segments")
 
@@ -477,15 +764,23 @@ def run_6shot_pipeline(
     shots = create_storyboard_shots(segments[:4])  # Use first 4 segments for verses
     status_messages.append("Created 6-shot storyboard structure")
 
-    # Step 3: Generate environment reference image (optional)
+    # Step 3: Generate environment reference image (optional) and extract the
+    # beat intro/outro (Step 5). Only the videos and the final mix use them, so
+    # both run in the background alongside the shots.
     environment_image = None
+    env_future = None
+    beat_future = None
+    background = ThreadPoolExecutor(max_workers=2)
     if generate_env_reference:
         status_messages.append("Generating environment reference image...")
-        environment_image, env_status = generate_environment_reference(
+        env_future = background.submit(
+            generate_environment_reference,
             location=location,
             video_style=video_style,
         )
-        status_messages.append(env_status)
+    if beat_path:
+        beat_future = background.submit(extract_beat_intro_outro, beat_path, intro_duration, outro_duration)
+    background.shutdown(wait=False)  # Lets the submitted calls finish, never blocks
 
     # Step 4: Generate 6 storyboard images
     status_messages.append("Generating 6 storyboard images...")
@@ -494,12 +789,13 @@ def run_6shot_pipeline(
     # Use reference photos if provided
     use_reference_photos = speaker_a_image and speaker_b_image
 
-    for shot in shots:
+    def shot_request(shot: StoryboardShot) -> tuple[str, str | None]:
+        """Prompt and edit source image (None for text-to-image) for one shot."""
         # Determine character description/image for this shot
-        if shot.primary_speaker == Speaker.PERSON_A:
+        if shot.primary_speaker is Speaker.PERSON_A:
             char_desc = character_a_desc
             ref_image = speaker_a_image
-        elif shot.primary_speaker == Speaker.PERSON_B:
+        elif shot.primary_speaker is Speaker.PERSON_B:
             char_desc = character_b_desc
             ref_image = speaker_b_image
         else:  # BOTH
@@ -510,24 +806,54 @@ def run_6shot_pipeline(
         shot_segment = BattleSegment(
             index=shot.index,
             speaker=shot.primary_speaker,
-            verses=[shot.verse_text] if shot.verse_text else ["..."],
+            verses=(shot.verse_text,) if shot.verse_text else ("...",),
             raw_text=shot.verse_text or "...",
-            is_conclusion=(shot.shot_type == ShotType.CLOSING),
+            is_conclusion=(shot.shot_type is ShotType.CLOSING),
         )
 
-        # Generate image
         if use_reference_photos and ref_image:
-            from app_gradio_fastapi.services.grok_image_api import edit_storyboard_image, build_edit_prompt
-            prompt = build_edit_prompt(shot_segment, video_style, location, char_desc)
-            img_path, img_status = edit_storyboard_image(ref_image, prompt)
-        else:
-            from app_gradio_fastapi.services.grok_image_api import generate_storyboard_image, build_storyboard_prompt
-            prompt = build_storyboard_prompt(shot_segment, video_style, location, char_desc, char_desc)
-            img_path, img_status = generate_storyboard_image(prompt)
+            return build_edit_prompt(shot_segment, video_style, location, char_desc), ref_image
+        return build_storyboard_prompt(shot_segment, video_style, location, char_desc, char_desc), None
+
+    def render(request: tuple[str, str | None], shot_index: int) -> tuple[str | None, str]:
+        prompt, ref_image = request
+
+        # Re-runs that only change script/audio skip the Grok call entirely
+        cache_path = IMAGE_CACHE_DIR / f"{_image_cache_key(prompt, video_style, ref_image)}.png"
+        if not refresh_images and cache_path.exists():
+            touch(cache_path)
+            return str(cache_path), f"Loaded cached storyboard image for shot {shot_index}"
+
+        # One file per request: concurrent renders must not share a path
+        output_path = STORYBOARD_DIR / f"shot_{shot_index}.png"
 
+        # Generate image
+        if ref_image:
+            img_path, img_status = edit_storyboard_image(ref_image, prompt, output_path)
+        else:
+            img_path, img_status = generate_storyboard_image(prompt, output_path)
+
+        if img_path is not None:
+            _store_cached_image(img_path, cache_path)
+        return img_path, img_status
+
+    # Shots with identical requests (e.g. opening and closing with no verse
+    # text) are rendered once and the image is shared
+    shot_requests = [shot_request(shot) for shot in shots]
+    first_shot = {}
+    for shot, request in zip(shots, shot_requests):
+        first_shot.setdefault(request, shot.index)
+
+    # Each request is an independent, network-bound Grok call, so render them
+    # side by side (capped to stay under the API rate limit)
+    with ThreadPoolExecutor(max_workers=IMAGE_CONCURRENCY) as executor:
+        rendered = dict(zip(first_shot, executor.map(render, first_shot, first_shot.values())))
+    results = [rendered[request] for request in shot_requests]
+
+    for shot, (img_path, img_status) in zip(shots, results):
         if img_path is None:
             status_messages.append(f"Failed at shot {shot.index}: {img_status}")
-            return SixShotPipelineResult(
+            yield SixShotPipelineResult(
                 success=False,
                 shots=shots,
                 environment_image=environment_image,
@@ -536,27 +862,39 @@ def run_6shot_pipeline(
                 final_video=None,
                 status_messages=status_messages,
             )
+            return
         storyboard_images.append(img_path)
 
     status_messages.append(f"Generated {len(storyboard_images)} storyboard images")
 
-    # Step 5: Extract intro/outro from beat
+    yield SixShotPipelineResult(
+        success=True,
+        shots=shots,
+        environment_image=environment_image,
+        storyboard_images=storyboard_images,
+        video_segments=[],
+        final_video=None,
+        status_messages=list(status_messages),
+    )
+
+    # Step 5: Extract intro/outro from beat (started in Step 3)
     intro_audio = None
     outro_audio = None
-    if beat_path:
+    if beat_future is not None:
         status_messages.append("Extracting intro/outro from beat track...")
-        intro_audio, intro_status = extract_beat_intro(beat_path, intro_duration)
-        status_messages.append(intro_status)
-        outro_audio, outro_status = extract_beat_outro(beat_path, outro_duration)
-        status_messages.append(outro_status)
+        intro_audio, outro_audio, beat_status = beat_future.result()
+        status_messages.append(beat_status)
+
+    if env_future is not None:
+        environment_image, env_status = env_future.result()
+        status_messages.append(env_status)
 
     # Step 6: Generate 6 videos with lip sync
     status_messages.append("Generating videos with Runway...")
 
     # Build theme and speakers lists
-    theme = f"{video_style} style, {location}"
-    speakers = [shot.primary_speaker.value for shot in shots]
-    verse_contexts = [shot.verse_text for shot in shots]
+    theme = _video_theme(video_style, location)
+    speakers, verse_contexts = map(list, zip(*((shot.primary_speaker.value, shot.verse_text) for shot in shots)))
 
     video_segments, vid_status = generate_6shot_videos(
         image_paths=storyboard_images,
@@ -571,7 +909,7 @@ def run_6shot_pipeline(
     status_messages.append(vid_status)
 
     if len(video_segments) != 6:
-        return SixShotPipelineResult(
+        yield SixShotPipelineResult(
             success=False,
             shots=shots,
             environment_image=environment_image,
@@ -580,6 +918,17 @@ def run_6shot_pipeline(
             final_video=None,
             status_messages=status_messages,
         )
+        return
+
+    yield SixShotPipelineResult(
+        success=True,
+        shots=shots,
+        environment_image=environment_image,
+        storyboard_images=storyboard_images,
+        video_segments=video_segments,
+        final_video=None,
+        status_messages=list(status_messages),
+    )
 
     # Step 7: Compose final video with audio
     status_messages.append("Composing final video...")
@@ -605,7 +954,7 @@ def run_6shot_pipeline(
     )
     status_messages.append(compose_status)
 
-    return SixShotPipelineResult(
+    yield SixShotPipelineResult(
         success=(final_video is not None),
         shots=shots,
         environment_image=environment_image,
@@ -614,3 +963,12 @@ def run_6shot_pipeline(
         final_video=final_video,
         status_messages=status_messages,
     )
+
+
+def run_6shot_pipeline(*args, **kwargs) -> SixShotPipelineResult:
+    """
+    Run the 6-shot storyboard pipeline and return only the final result.
+
+    Takes the same arguments as iter_6shot_pipeline.
+    """
+    return _last(iter_6shot_pipeline(*args, **kwargs))
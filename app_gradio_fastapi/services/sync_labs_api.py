@@ -4,10 +4,18 @@ Uses sync.so API to sync lip movements in videos to match audio.
 """
 
 import os
+import threading
 import time
+import uuid
+import orjson
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
+from requests_toolbelt import MultipartEncoder
+
+from app_gradio_fastapi.helpers.backoff import backoff_delay
+from app_gradio_fastapi.helpers.http import make_session, stream_to_file
 
 load_dotenv()
 
@@ -15,24 +23,64 @@ SYNC_API_KEY = os.environ.get("SYNC_API_KEY")
 API_BASE = "https://api.sync.so/v2"
 OUTPUTS_DIR = Path("outputs/lipsynced")
 
+# Public base URL of this app; when set, Sync Labs calls back on completion
+# instead of lipsync_video polling for it
+PUBLIC_URL = os.environ.get("PUBLIC_URL", "").rstrip("/")
+WEBHOOK_PATH = "/webhooks/synclabs"
+# Safety-net poll interval while waiting on a webhook, in case it never arrives
+WEBHOOK_FALLBACK_INTERVAL = 30.0
+
+# Webhook token -> event set when Sync Labs reports the job finished
+_webhook_events: dict[str, threading.Event] = {}
+_webhook_lock = threading.Lock()
+
+# Max lip sync jobs in flight at once, to stay within Sync Labs rate limits
+LIPSYNC_CONCURRENCY = 5
+
+# Max concurrent temp-host uploads; matches the session's connection pool size
+UPLOAD_CONCURRENCY = 8
+
+# Shared keep-alive pool so uploads, job polling and downloads reuse TLS connections
+_SESSION = make_session(pool_maxsize=UPLOAD_CONCURRENCY)
 
-def upload_to_temp_host(file_path: str) -> tuple[str | None, str]:
+
+def upload_to_temp_host(file_path: str, retries: int = 2) -> tuple[str | None, str]:
     """
     Upload a local file to litterbox.catbox.moe for temporary hosting.
     Files are kept for 1 hour.
 
     Args:
         file_path: Path to the local file
+        retries: Extra attempts after a failed upload, backing off 1s, 2s, 4s...
 
     Returns:
         Tuple of (url, status_message)
     """
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(2 ** (attempt - 1))
+
+        url, status = _upload_once(file_path)
+        if url is not None:
+            return url, status
+
+    return None, status
+
+
+def _upload_once(file_path: str) -> tuple[str | None, str]:
+    """Single upload attempt to litterbox."""
     try:
         with open(file_path, "rb") as f:
-            response = requests.post(
+            # Streams the file from disk instead of building the whole body in memory
+            body = MultipartEncoder(fields={
+                "reqtype": "fileupload",
+                "time": "1h",
+                "fileToUpload": (Path(file_path).name, f),
+            })
+            response = _SESSION.post(
                 "https://litterbox.catbox.moe/resources/internals/api.php",
-                data={"reqtype": "fileupload", "time": "1h"},
-                files={"fileToUpload": f},
+                data=body,
+                headers={"Content-Type": body.content_type},
                 timeout=120,
             )
 
@@ -64,19 +112,25 @@ def upload_files_for_lipsync(
     Returns:
         Tuple of (video_urls, audio_urls, status_message)
     """
+    # Uploads are network-bound, so send every file at once
+    paths = list(video_paths) + list(audio_paths)
+    if paths:
+        with ThreadPoolExecutor(max_workers=min(UPLOAD_CONCURRENCY, len(paths))) as executor:
+            results = list(executor.map(upload_to_temp_host, paths))
+    else:
+        results = []
+    video_results = results[:len(video_paths)]
+    audio_results = results[len(video_paths):]
+
     video_urls = []
     audio_urls = []
 
-    # Upload videos
-    for i, path in enumerate(video_paths):
-        url, status = upload_to_temp_host(path)
+    for i, (url, status) in enumerate(video_results):
         if url is None:
             return video_urls, audio_urls, f"Failed to upload video {i}: {status}"
         video_urls.append(url)
 
-    # Upload audio
-    for i, path in enumerate(audio_paths):
-        url, status = upload_to_temp_host(path)
+    for i, (url, status) in enumerate(audio_results):
         if url is None:
             return video_urls, audio_urls, f"Failed to upload audio {i}: {status}"
         audio_urls.append(url)
@@ -127,17 +181,17 @@ def create_lipsync_generation(
         payload["webhookUrl"] = webhook_url
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_BASE}/generate",
             headers=headers,
-            json=payload,
+            data=orjson.dumps(payload),
             timeout=60,
         )
 
         if response.status_code not in [200, 201]:
             return None, f"API Error {response.status_code}: {response.text}"
 
-        data = response.json()
+        data = orjson.loads(response.content)
         generation_id = data.get("id")
 
         if not generation_id:
@@ -168,7 +222,7 @@ def get_generation_status(generation_id: str) -> tuple[dict | None, str]:
     }
 
     try:
-        response = requests.get(
+        response = _SESSION.get(
             f"{API_BASE}/generate/{generation_id}",
             headers=headers,
             timeout=30,
@@ -177,7 +231,7 @@ def get_generation_status(generation_id: str) -> tuple[dict | None, str]:
         if response.status_code != 200:
             return None, f"API Error {response.status_code}: {response.text}"
 
-        return response.json(), "Status retrieved"
+        return orjson.loads(response.content), "Status retrieved"
 
     except Exception as e:
         return None, f"Error: {e}"
@@ -186,20 +240,25 @@ def get_generation_status(generation_id: str) -> tuple[dict | None, str]:
 def poll_generation_completion(
     generation_id: str,
     max_wait: int = 600,
-    poll_interval: int = 10,
+    poll_interval: float = 2.0,
+    max_interval: float = 30.0,
+    wake_event: threading.Event | None = None,
 ) -> tuple[str | None, str]:
     """
-    Poll for generation completion and return the output URL.
+    Poll for generation completion with jittered exponential backoff and return the output URL.
 
     Args:
         generation_id: The generation job ID
         max_wait: Maximum seconds to wait
-        poll_interval: Seconds between polls
+        poll_interval: Seconds before the second poll; grows 1.5x per poll
+        max_interval: Upper bound on the delay between polls
+        wake_event: Optional event that cuts the current wait short (set by the webhook)
 
     Returns:
         Tuple of (output_url, status_message)
     """
     start_time = time.time()
+    attempt = 0
 
     while time.time() - start_time < max_wait:
         data, status = get_generation_status(generation_id)
@@ -224,7 +283,12 @@ def poll_generation_completion(
             return None, "Lip sync job was rejected"
 
         elif job_status in ["PENDING", "PROCESSING"]:
-            time.sleep(poll_interval)
+            delay = backoff_delay(attempt, poll_interval, max_interval)
+            if wake_event is None:
+                time.sleep(delay)
+            elif wake_event.wait(delay):
+                wake_event.clear()
+            attempt += 1
             continue
 
         else:
@@ -233,17 +297,39 @@ def poll_generation_completion(
     return None, f"Timeout: Job did not complete within {max_wait} seconds"
 
 
+def notify_webhook(token: str) -> bool:
+    """
+    Wake the lipsync_video call waiting on a webhook token.
+
+    Returns:
+        False if the token is unknown (already finished or never issued)
+    """
+    with _webhook_lock:
+        event = _webhook_events.get(token)
+    if event is None:
+        return False
+    event.set()
+    return True
+
+
+def _open_webhook() -> tuple[str, threading.Event]:
+    """Register a one-off webhook token and return (webhook_url, event)."""
+    token = uuid.uuid4().hex
+    event = threading.Event()
+    with _webhook_lock:
+        _webhook_events[token] = event
+    return f"{PUBLIC_URL}{WEBHOOK_PATH}/{token}", event
+
+
+def _close_webhook(webhook_url: str) -> None:
+    with _webhook_lock:
+        _webhook_events.pop(webhook_url.rsplit("/", 1)[-1], None)
+
+
 def download_video(url: str, output_path: Path) -> str:
     """Download video from URL to local path."""
     try:
-        response = requests.get(url, stream=True, timeout=120)
-        response.raise_for_status()
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
+        stream_to_file(_SESSION, url, output_path)
         return f"Downloaded to {output_path}"
     except Exception as e:
         return f"Error downloading: {e}"
@@ -278,19 +364,35 @@ def lipsync_video(
     if not audio_path.startswith("http"):
         return None, "Error: audio_path must be a URL (Sync Labs requires URLs)"
 
-    # Create the generation job
-    gen_id, status = create_lipsync_generation(
-        video_url=video_path,
-        audio_url=audio_path,
-        model=model,
-        sync_mode=sync_mode,
-    )
+    # With a public URL, wait for Sync Labs' callback and only poll as a fallback
+    webhook_url, wake_event = _open_webhook() if PUBLIC_URL else (None, None)
 
-    if gen_id is None:
-        return None, status
+    try:
+        # Create the generation job
+        gen_id, status = create_lipsync_generation(
+            video_url=video_path,
+            audio_url=audio_path,
+            model=model,
+            sync_mode=sync_mode,
+            webhook_url=webhook_url,
+        )
 
-    # Poll for completion
-    output_url, status = poll_generation_completion(gen_id)
+        if gen_id is None:
+            return None, status
+
+        # Poll for completion; with a webhook each wait ends early once it fires
+        if wake_event is None:
+            output_url, status = poll_generation_completion(gen_id)
+        else:
+            output_url, status = poll_generation_completion(
+                gen_id,
+                poll_interval=WEBHOOK_FALLBACK_INTERVAL,
+                max_interval=WEBHOOK_FALLBACK_INTERVAL,
+                wake_event=wake_event,
+            )
+    finally:
+        if webhook_url:
+            _close_webhook(webhook_url)
 
     if output_url is None:
         return None, status
@@ -316,6 +418,8 @@ def lipsync_all_segments(
     """
     Lip sync all video segments with their corresponding audio.
 
+    Segments are submitted and polled concurrently (up to LIPSYNC_CONCURRENCY).
+
     Args:
         video_urls: List of video URLs
         audio_urls: List of audio URLs (same length as video_urls)
@@ -328,23 +432,25 @@ def lipsync_all_segments(
     if len(video_urls) != len(audio_urls):
         return [], f"Error: video and audio counts don't match ({len(video_urls)} vs {len(audio_urls)})"
 
-    output_urls = []
     OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    for i, (video_url, audio_url) in enumerate(zip(video_urls, audio_urls)):
-        output_path = OUTPUTS_DIR / f"segment_{i}_lipsynced.mp4"
-
-        result_path, status = lipsync_video(
+    def sync_segment(i: int, video_url: str, audio_url: str) -> tuple[str | None, str]:
+        return lipsync_video(
             video_path=video_url,
             audio_path=audio_url,
-            output_path=output_path,
+            output_path=OUTPUTS_DIR / f"segment_{i}_lipsynced.mp4",
             model=model,
             sync_mode=sync_mode,
         )
 
+    # Each job is minutes of remote work and polling, so run them side by side
+    with ThreadPoolExecutor(max_workers=LIPSYNC_CONCURRENCY) as executor:
+        results = list(executor.map(sync_segment, range(len(video_urls)), video_urls, audio_urls))
+
+    output_urls = []
+    for i, (result_path, status) in enumerate(results):
         if result_path is None:
             return output_urls, f"Failed at segment {i}: {status}"
-
         output_urls.append(result_path)
 
     return output_urls, f"Lip synced {len(output_urls)} segments"
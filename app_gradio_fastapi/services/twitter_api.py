@@ -4,27 +4,135 @@ Grok API integration for fetching X/Twitter data using x_search tool.
 Uses the xAI Responses API with server-side x_search tool for real-time tweet fetching.
 """
 
+import hashlib
+import json
 import logging
 import os
 import re
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
+import orjson
 import requests
 from dotenv import load_dotenv
 
+from app_gradio_fastapi.helpers.http import make_session
+
 load_dotenv()
 
 API_KEY = os.environ.get("XAI_API_KEY")
 API_BASE = "https://api.x.ai/v1"
 
+# Shared keep-alive pool for x_search calls; a battle fires up to three at once.
+_SESSION = make_session(pool_maxsize=4, pool_connections=1)
+
+# x_search results persisted across runs; a lookup takes 60-90s and rarely changes within a day
+_SEARCH_CACHE_DIR = Path(".cache/x_search")
+_SEARCH_CACHE_TTL = 24 * 60 * 60
+_search_memo: dict[str, tuple[float, str]] = {}
+_search_memo_lock = threading.Lock()
+
+# List item prefixes in Grok's tweet/exchange lists
+_NUM_PREFIX = re.compile(r"^\d+[\.\)]\s*")
+_BULLET_PREFIX = re.compile(r"^[-*]\s*")
+
+# Labelled sections of the relationship analysis; a section ends at a blank
+# line or at the next line starting with a letter (IGNORECASE widens [A-Z])
+_SUMMARY_RE = re.compile(r"SUMMARY:\s*(.+?)(?:\n\n|\n[A-Z]|$)", re.IGNORECASE | re.DOTALL)
+_COMMON_RE = re.compile(r"COMMON.?GROUND:\s*(.+?)(?:\n\n|\n[A-Z]|$)", re.IGNORECASE | re.DOTALL)
+_CONFLICT_RE = re.compile(r"POINTS?.?OF.?CONFLICT:\s*(.+?)(?:\n\n|\n[A-Z]|$)", re.IGNORECASE | re.DOTALL)
+_EXCHANGES_RE = re.compile(r"NOTABLE.?EXCHANGES?:\s*(.+?)(?:\n\n|$)", re.IGNORECASE | re.DOTALL)
+
+# Section markers in the combined battle-context answer
+_SECTION_RE = re.compile(r"^\W*=+\s*(TWEETS_A|TWEETS_B|RELATIONSHIP)\s*=+\W*$", re.MULTILINE)
+
+# Interaction keywords and the cue each one signals
+_INTERACTION_KEYWORDS = {
+    "hostile": "hostile", "beef": "hostile", "conflict": "hostile",
+    "friendly": "friendly", "supportive": "friendly", "collaborate": "friendly",
+    "neutral": "neutral", "professional": "neutral",
+    "no interaction": "none", "haven't interacted": "none",
+    "mention": "mention", "replied": "mention", "quote": "mention",
+}
+# Lookahead so overlapping keywords are all seen in a single scan
+_INTERACTION_RE = re.compile("(?=(" + "|".join(map(re.escape, _INTERACTION_KEYWORDS)) + "))")
+# Strongest cue wins: (cue, interaction_type, has_interaction)
+_INTERACTION_PRIORITY = (
+    ("hostile", "hostile", True),
+    ("friendly", "friendly", True),
+    ("neutral", "neutral", True),
+    ("none", "none", False),
+    ("mention", "neutral", True),
+)
+
+
+def _normalize_handle(handle: str | None) -> str:
+    """Strip a leading @ and surrounding whitespace; empty string for no handle."""
+    return handle.lstrip("@").strip() if handle else ""
+
+
+def _search_cache_file(key: str) -> Path:
+    return _SEARCH_CACHE_DIR / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json"
+
+
+def _search_cache_get(key: str):
+    """Return a fresh copy of a cached x_search result younger than the TTL, or None."""
+    now = time.time()
+    with _search_memo_lock:
+        hit = _search_memo.get(key)
+
+    if hit and now - hit[0] < _SEARCH_CACHE_TTL:
+        payload = hit[1]
+    else:
+        cache_file = _search_cache_file(key)
+        try:
+            stored_at = cache_file.stat().st_mtime
+            if now - stored_at >= _SEARCH_CACHE_TTL:
+                return None
+            payload = cache_file.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        with _search_memo_lock:
+            _search_memo[key] = (stored_at, payload)
+
+    # Entries are kept serialized so callers can't mutate the cached value
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _search_cache_put(key: str, value) -> None:
+    """Store an x_search result in memory and, best effort, on disk."""
+    payload = json.dumps(value)
+    with _search_memo_lock:
+        _search_memo[key] = (time.time(), payload)
 
-def fetch_recent_tweets(handle: str, limit: int = 10) -> tuple[list[str], str]:
+    # Write to a temp file and rename so readers never see a partial entry
+    try:
+        _SEARCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file = _search_cache_file(key)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_file.write_text(payload, encoding="utf-8")
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
+
+def fetch_recent_tweets(
+    handle: str, limit: int = 10, refresh: bool = False
+) -> tuple[list[str], str]:
     """
     Fetch recent tweets from an X handle using Grok x_search.
 
+    Successful results are cached for 24 hours per (handle, limit).
+
     Args:
         handle: X/Twitter handle (with or without @)
         limit: Maximum number of tweets to fetch
+        refresh: Skip the cache and query x_search again
 
     Returns:
         Tuple of (list of tweet texts, status_message)
@@ -35,11 +143,17 @@ def fetch_recent_tweets(handle: str, limit: int = 10) -> tuple[list[str], str]:
     if not handle:
         return [], "No handle provided"
 
-    # Normalize handle (remove @ if present)
-    clean_handle = handle.lstrip("@").strip()
+    clean_handle = _normalize_handle(handle)
     if not clean_handle:
         return [], "Invalid handle"
 
+    # Handles are case-insensitive on X
+    cache_key = f"tweets|{clean_handle.lower()}|{limit}"
+    if not refresh:
+        cached = _search_cache_get(cache_key)
+        if cached is not None:
+            return cached, f"Found {len(cached)} tweets from @{clean_handle} (cached)"
+
     prompt = f"""Find the {limit} most recent tweets from @{clean_handle}.
 For each tweet, provide:
 - The tweet text
@@ -48,43 +162,33 @@ For each tweet, provide:
 Format as a numbered list. Focus on tweets that reveal personality, opinions, or current interests."""
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_BASE}/responses",
             headers={
                 "Authorization": f"Bearer {API_KEY}",
                 "Content-Type": "application/json",
             },
-            json={
+            data=orjson.dumps({
                 "model": "grok-4-1-fast",
                 "input": [{"role": "user", "content": prompt}],
                 "tools": [
                     {"type": "x_search", "allowed_x_handles": [clean_handle]}
                 ],
-            },
+            }),
             timeout=60,
         )
 
         if response.status_code != 200:
             return [], f"API Error {response.status_code}: {response.text}"
 
-        data = response.json()
-
-        # Extract the output text from the response
-        output_text = ""
-        if "output" in data:
-            for item in data["output"]:
-                if item.get("type") == "message" and "content" in item:
-                    for content_block in item["content"]:
-                        if content_block.get("type") == "output_text":
-                            output_text += content_block.get("text", "")
+        data = orjson.loads(response.content)
 
-        if not output_text:
-            # Fallback: try to get from choices if present
-            if "choices" in data:
-                output_text = data["choices"][0]["message"]["content"]
+        output_text = _response_text(data)
 
         # Parse tweets from the response
         tweets = _parse_tweet_list(output_text)
+        if tweets:
+            _search_cache_put(cache_key, tweets)
 
         return tweets, f"Found {len(tweets)} tweets from @{clean_handle}"
 
@@ -92,19 +196,22 @@ Format as a numbered list. Focus on tweets that reveal personality, opinions, or
         return [], "Error: Request timed out"
     except requests.exceptions.RequestException as e:
         return [], f"Request error: {e}"
-    except (KeyError, IndexError) as e:
+    except (KeyError, IndexError, orjson.JSONDecodeError) as e:
         return [], f"Error parsing response: {e}"
 
 
 def analyze_opponent_relationship(
-    handle_a: str, handle_b: str
+    handle_a: str, handle_b: str, refresh: bool = False
 ) -> tuple[dict, str]:
     """
     Check for interactions between two X handles - mentions, replies, beef.
 
+    Successful results are cached for 24 hours per unordered handle pair.
+
     Args:
         handle_a: First X handle
         handle_b: Second X handle
+        refresh: Skip the cache and query x_search again
 
     Returns:
         Tuple of (relationship_dict, status_message)
@@ -117,12 +224,19 @@ def analyze_opponent_relationship(
     if not API_KEY:
         return {"has_interaction": False}, "Error: XAI_API_KEY not set"
 
-    clean_a = handle_a.lstrip("@").strip() if handle_a else ""
-    clean_b = handle_b.lstrip("@").strip() if handle_b else ""
+    clean_a = _normalize_handle(handle_a)
+    clean_b = _normalize_handle(handle_b)
 
     if not clean_a or not clean_b:
         return {"has_interaction": False}, "Both handles required"
 
+    # (A, B) and (B, A) describe the same relationship
+    cache_key = "relationship|" + "|".join(sorted((clean_a.lower(), clean_b.lower())))
+    if not refresh:
+        cached = _search_cache_get(cache_key)
+        if cached is not None:
+            return cached, f"Analyzed relationship between @{clean_a} and @{clean_b} (cached)"
+
     prompt = f"""Analyze the relationship between @{clean_a} and @{clean_b} on X/Twitter.
 
 Search for:
@@ -140,41 +254,33 @@ Provide a summary with:
 - POINTS_OF_CONFLICT: Disagreements or opposing views (for rap battle material)"""
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_BASE}/responses",
             headers={
                 "Authorization": f"Bearer {API_KEY}",
                 "Content-Type": "application/json",
             },
-            json={
+            data=orjson.dumps({
                 "model": "grok-4-1-fast",
                 "input": [{"role": "user", "content": prompt}],
                 "tools": [
                     {"type": "x_search", "allowed_x_handles": [clean_a, clean_b]}
                 ],
-            },
+            }),
             timeout=90,
         )
 
         if response.status_code != 200:
             return {"has_interaction": False}, f"API Error {response.status_code}"
 
-        data = response.json()
+        data = orjson.loads(response.content)
 
-        # Extract output text
-        output_text = ""
-        if "output" in data:
-            for item in data["output"]:
-                if item.get("type") == "message" and "content" in item:
-                    for content_block in item["content"]:
-                        if content_block.get("type") == "output_text":
-                            output_text += content_block.get("text", "")
-
-        if not output_text and "choices" in data:
-            output_text = data["choices"][0]["message"]["content"]
+        output_text = _response_text(data)
 
         # Parse the relationship analysis
         relationship = _parse_relationship_analysis(output_text)
+        if output_text:
+            _search_cache_put(cache_key, relationship)
 
         return relationship, f"Analyzed relationship between @{clean_a} and @{clean_b}"
 
@@ -186,6 +292,107 @@ Provide a summary with:
         return {"has_interaction": False}, f"Error: {e}"
 
 
+def fetch_battle_context(
+    handle_a: str, handle_b: str, limit: int = 5, refresh: bool = False
+) -> tuple[tuple[list[str] | None, list[str] | None, dict | None] | None, str]:
+    """
+    Fetch both fighters' recent tweets and their relationship in one x_search call.
+
+    Results are shared with the fetch_recent_tweets and
+    analyze_opponent_relationship caches.
+
+    Args:
+        handle_a: First X handle
+        handle_b: Second X handle
+        limit: Maximum number of tweets per handle
+        refresh: Skip the cache and query x_search again
+
+    Returns:
+        Tuple of ((tweets_a, tweets_b, relationship) or None on failure, status_message).
+        A part is None when its section was missing from the answer.
+    """
+    if not API_KEY:
+        return None, "Error: XAI_API_KEY not set in environment"
+
+    clean_a = _normalize_handle(handle_a)
+    clean_b = _normalize_handle(handle_b)
+
+    if not clean_a or not clean_b:
+        return None, "Both handles required"
+
+    tweets_a_key = f"tweets|{clean_a.lower()}|{limit}"
+    tweets_b_key = f"tweets|{clean_b.lower()}|{limit}"
+    relationship_key = "relationship|" + "|".join(sorted((clean_a.lower(), clean_b.lower())))
+
+    if not refresh:
+        cached = tuple(_search_cache_get(key) for key in (tweets_a_key, tweets_b_key, relationship_key))
+        if None not in cached:
+            return cached, f"Fetched context for @{clean_a} and @{clean_b} (cached)"
+
+    prompt = f"""Research @{clean_a} and @{clean_b} on X/Twitter for a rap battle between them.
+
+Answer in exactly three sections, each starting with its marker line as written.
+
+=== TWEETS_A ===
+The {limit} most recent tweets from @{clean_a} as a numbered list, each with the tweet text and key topics.
+Focus on tweets that reveal personality, opinions, or current interests.
+
+=== TWEETS_B ===
+The {limit} most recent tweets from @{clean_b}, in the same format.
+
+=== RELATIONSHIP ===
+Direct mentions, replies, quote tweets, public "beef" or support between them, as:
+- INTERACTION_TYPE: friendly / neutral / hostile / none
+- SUMMARY: 1-2 sentence overview of their relationship
+- NOTABLE_EXCHANGES: List any specific notable tweets between them
+- COMMON_GROUND: Topics they both care about (for rap battle material)
+- POINTS_OF_CONFLICT: Disagreements or opposing views (for rap battle material)"""
+
+    try:
+        response = _SESSION.post(
+            f"{API_BASE}/responses",
+            headers={
+                "Authorization": f"Bearer {API_KEY}",
+                "Content-Type": "application/json",
+            },
+            data=orjson.dumps({
+                "model": "grok-4-1-fast",
+                "input": [{"role": "user", "content": prompt}],
+                "tools": [
+                    {"type": "x_search", "allowed_x_handles": [clean_a, clean_b]}
+                ],
+            }),
+            timeout=90,
+        )
+
+        if response.status_code != 200:
+            return None, f"API Error {response.status_code}: {response.text}"
+
+        sections = _split_sections(_response_text(orjson.loads(response.content)))
+
+    except requests.exceptions.Timeout:
+        return None, "Error: Request timed out"
+    except requests.exceptions.RequestException as e:
+        return None, f"Request error: {e}"
+    except (KeyError, IndexError, orjson.JSONDecodeError) as e:
+        return None, f"Error parsing response: {e}"
+
+    tweets_a = _parse_tweet_list(sections["TWEETS_A"]) if "TWEETS_A" in sections else None
+    tweets_b = _parse_tweet_list(sections["TWEETS_B"]) if "TWEETS_B" in sections else None
+    relationship = None
+    if sections.get("RELATIONSHIP", "").strip():
+        relationship = _parse_relationship_analysis(sections["RELATIONSHIP"])
+
+    if tweets_a:
+        _search_cache_put(tweets_a_key, tweets_a)
+    if tweets_b:
+        _search_cache_put(tweets_b_key, tweets_b)
+    if relationship is not None:
+        _search_cache_put(relationship_key, relationship)
+
+    return (tweets_a, tweets_b, relationship), f"Fetched context for @{clean_a} and @{clean_b}"
+
+
 def get_tweet_context_for_battle(
     char1_handle: str | None,
     char2_handle: str | None,
@@ -200,25 +407,41 @@ def get_tweet_context_for_battle(
     Returns:
         Tuple of (context_string, status_message)
     """
+    # Normalize once; the fetch helpers accept the clean form as-is
+    char1_handle = _normalize_handle(char1_handle)
+    char2_handle = _normalize_handle(char2_handle)
+
     context_parts = []
     statuses = []
-    tweets1 = []
-    tweets2 = []
-    relationship = {"has_interaction": False}
+    tweets1 = None
+    tweets2 = None
+    relationship = None
+
+    # With both handles, one combined x_search call replaces three separate ones
+    if char1_handle and char2_handle:
+        logging.info(f"Fetching combined context for {char1_handle} vs {char2_handle}")
+        combined, combined_status = fetch_battle_context(char1_handle, char2_handle, 5)
+        statuses.append(combined_status)
+        logging.info(f"Got combined context: {combined_status}")
+        if combined is None:
+            # The separate lookups would hit the same failure, so don't retry them
+            tweets1, tweets2, relationship = [], [], {"has_interaction": False}
+        else:
+            tweets1, tweets2, relationship = combined
 
-    # Run all API calls in parallel
+    # Separate lookups for a single handle, or for sections the combined answer lacked
     with ThreadPoolExecutor(max_workers=3) as executor:
         futures = {}
 
-        if char1_handle:
+        if char1_handle and tweets1 is None:
             logging.info(f"Submitting tweet fetch for {char1_handle}")
             futures["tweets1"] = executor.submit(fetch_recent_tweets, char1_handle, 5)
 
-        if char2_handle:
+        if char2_handle and tweets2 is None:
             logging.info(f"Submitting tweet fetch for {char2_handle}")
             futures["tweets2"] = executor.submit(fetch_recent_tweets, char2_handle, 5)
 
-        if char1_handle and char2_handle:
+        if char1_handle and char2_handle and relationship is None:
             logging.info(f"Submitting relationship analysis for {char1_handle} vs {char2_handle}")
             futures["relationship"] = executor.submit(
                 analyze_opponent_relationship, char1_handle, char2_handle
@@ -244,17 +467,20 @@ def get_tweet_context_for_battle(
                 logging.error(f"Error fetching {key}: {e}")
                 statuses.append(f"Error: {e}")
 
+    tweets1 = tweets1 or []
+    tweets2 = tweets2 or []
+    if relationship is None:
+        relationship = {"has_interaction": False}
+
     # Build context from results
     if tweets1:
-        clean_handle = char1_handle.lstrip("@")
-        context_parts.append(f"RECENT TWEETS FROM @{clean_handle}:")
+        context_parts.append(f"RECENT TWEETS FROM @{char1_handle}:")
         for tweet in tweets1[:5]:
             context_parts.append(f"  - {tweet}")
         context_parts.append("")
 
     if tweets2:
-        clean_handle = char2_handle.lstrip("@")
-        context_parts.append(f"RECENT TWEETS FROM @{clean_handle}:")
+        context_parts.append(f"RECENT TWEETS FROM @{char2_handle}:")
         for tweet in tweets2[:5]:
             context_parts.append(f"  - {tweet}")
         context_parts.append("")
@@ -281,6 +507,29 @@ def get_tweet_context_for_battle(
     return context, status
 
 
+def _response_text(data: dict) -> str:
+    """Collect the answer text from a Responses API (or chat completions) payload."""
+    output_text = ""
+    if "output" in data:
+        for item in data["output"]:
+            if item.get("type") == "message" and "content" in item:
+                for content_block in item["content"]:
+                    if content_block.get("type") == "output_text":
+                        output_text += content_block.get("text", "")
+
+    if not output_text and "choices" in data:
+        output_text = data["choices"][0]["message"]["content"]
+
+    return output_text
+
+
+def _split_sections(text: str) -> dict[str, str]:
+    """Split the combined battle-context answer on its === SECTION === markers."""
+    parts = _SECTION_RE.split(text)
+    # parts alternates [preamble, name, body, name, body, ...]
+    return dict(zip(parts[1::2], parts[2::2]))
+
+
 def _parse_tweet_list(text: str) -> list[str]:
     """Parse a numbered or bulleted list of tweets from text."""
     tweets = []
@@ -295,17 +544,13 @@ def _parse_tweet_list(text: str) -> list[str]:
                 current_tweet = []
             continue
 
-        # Check if this is a new numbered item
-        if re.match(r"^\d+[\.\)]\s*", line):
+        # Check if this is a new numbered or bulleted item
+        prefix = _NUM_PREFIX.match(line) or _BULLET_PREFIX.match(line)
+        if prefix:
             if current_tweet:
                 tweets.append(" ".join(current_tweet))
-            # Remove the number prefix
-            cleaned = re.sub(r"^\d+[\.\)]\s*", "", line)
-            current_tweet = [cleaned] if cleaned else []
-        elif re.match(r"^[-*]\s*", line):
-            if current_tweet:
-                tweets.append(" ".join(current_tweet))
-            cleaned = re.sub(r"^[-*]\s*", "", line)
+            # Remove the number/bullet prefix
+            cleaned = line[prefix.end():]
             current_tweet = [cleaned] if cleaned else []
         else:
             current_tweet.append(line)
@@ -327,28 +572,16 @@ def _parse_relationship_analysis(text: str) -> dict:
         "points_of_conflict": "",
     }
 
-    text_lower = text.lower()
-
-    # Detect interaction type
-    if "hostile" in text_lower or "beef" in text_lower or "conflict" in text_lower:
-        result["interaction_type"] = "hostile"
-        result["has_interaction"] = True
-    elif "friendly" in text_lower or "supportive" in text_lower or "collaborate" in text_lower:
-        result["interaction_type"] = "friendly"
-        result["has_interaction"] = True
-    elif "neutral" in text_lower or "professional" in text_lower:
-        result["interaction_type"] = "neutral"
-        result["has_interaction"] = True
-    elif "no interaction" in text_lower or "haven't interacted" in text_lower:
-        result["interaction_type"] = "none"
-    else:
-        # Check for any mentions of interaction
-        if "mention" in text_lower or "replied" in text_lower or "quote" in text_lower:
-            result["interaction_type"] = "neutral"
-            result["has_interaction"] = True
+    # Detect interaction type: collect every cue in one pass, then take the strongest
+    cues = {_INTERACTION_KEYWORDS[m.group(1)] for m in _INTERACTION_RE.finditer(text.lower())}
+    for cue, interaction_type, has_interaction in _INTERACTION_PRIORITY:
+        if cue in cues:
+            result["interaction_type"] = interaction_type
+            result["has_interaction"] = has_interaction
+            break
 
     # Extract summary (first paragraph or SUMMARY: section)
-    summary_match = re.search(r"SUMMARY:\s*(.+?)(?:\n\n|\n[A-Z]|$)", text, re.IGNORECASE | re.DOTALL)
+    summary_match = _SUMMARY_RE.search(text)
     if summary_match:
         result["summary"] = summary_match.group(1).strip()
     else:
@@ -361,17 +594,17 @@ def _parse_relationship_analysis(text: str) -> dict:
                 break
 
     # Extract common ground
-    common_match = re.search(r"COMMON.?GROUND:\s*(.+?)(?:\n\n|\n[A-Z]|$)", text, re.IGNORECASE | re.DOTALL)
+    common_match = _COMMON_RE.search(text)
     if common_match:
         result["common_ground"] = common_match.group(1).strip()
 
     # Extract points of conflict
-    conflict_match = re.search(r"POINTS?.?OF.?CONFLICT:\s*(.+?)(?:\n\n|\n[A-Z]|$)", text, re.IGNORECASE | re.DOTALL)
+    conflict_match = _CONFLICT_RE.search(text)
     if conflict_match:
         result["points_of_conflict"] = conflict_match.group(1).strip()
 
     # Extract notable exchanges
-    exchanges_match = re.search(r"NOTABLE.?EXCHANGES?:\s*(.+?)(?:\n\n|$)", text, re.IGNORECASE | re.DOTALL)
+    exchanges_match = _EXCHANGES_RE.search(text)
     if exchanges_match:
         exchanges_text = exchanges_match.group(1)
         result["notable_exchanges"] = _parse_tweet_list(exchanges_text)
@@ -1,8 +1,17 @@
 """
 Video composer for combining video segments with audio.
-Uses moviepy for video editing operations.
+Uses moviepy for video editing operations, with ffmpeg fast paths when the
+segments match: stream copy for hard cuts, one xfade filter graph for crossfades.
 """
 
+import functools
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from moviepy import (
     VideoFileClip,
@@ -13,6 +22,25 @@ from moviepy import (
 
 OUTPUTS_DIR = Path("outputs/final")
 
+# libx264 settings: deliverables use FINAL_PRESET; intermediates that are re-encoded by a
+# later stage trade file size for speed (near-lossless CRF keeps the re-encode clean)
+FINAL_PRESET = "medium"
+INTERMEDIATE_PRESET = "ultrafast"
+INTERMEDIATE_X264_PARAMS = ["-tune", "zerolatency", "-crf", "18"]
+
+# Speed changes under this fraction retime the copied stream instead of re-encoding it
+RETIME_COPY_TOLERANCE = 0.05
+
+# Hardware H.264 encoders tried before libx264: (codec, preset, extra ffmpeg args)
+_HW_ENCODERS = (
+    ("h264_nvenc", "p4", ["-tune", "hq", "-rc", "vbr", "-b:v", "8M"]),
+    ("h264_videotoolbox", "medium", ["-b:v", "8M"]),
+    ("h264_qsv", "medium", ["-b:v", "8M"]),
+)
+
+# Video stream fields that must match across segments to concatenate them without re-encoding
+_COPY_STREAM_FIELDS = ("codec_name", "width", "height", "r_frame_rate", "pix_fmt")
+
 
 def parse_segment_timings(timing_str: str) -> list[float]:
     """
@@ -66,6 +94,402 @@ def trim_or_loop_video(clip: VideoFileClip, target_duration: float) -> VideoFile
         return looped.subclipped(0, target_duration)
 
 
+@functools.lru_cache(maxsize=1)
+def _video_encoder() -> tuple[str, str, list[str]]:
+    """Pick the first hardware H.264 encoder that works on this machine, else libx264."""
+    from moviepy.config import FFMPEG_BINARY
+
+    for codec, preset, params in _HW_ENCODERS:
+        # Builds list encoders whose hardware or driver is missing, so try a tiny encode
+        try:
+            result = subprocess.run(
+                [
+                    FFMPEG_BINARY, "-v", "error",
+                    "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                    "-c:v", codec, "-f", "null", "-",
+                ],
+                capture_output=True,
+                timeout=15,
+            )
+        except Exception:
+            continue
+        if result.returncode == 0:
+            logging.info(f"Using hardware video encoder {codec}")
+            return codec, preset, params
+
+    return "libx264", FINAL_PRESET, []
+
+
+def _write_video(
+    clip,
+    output_path: str | Path,
+    x264_preset: str = FINAL_PRESET,
+    x264_params: list[str] | None = None,
+    **kwargs,
+) -> None:
+    """write_videofile with the detected H.264 encoder, redoing it on libx264 if that fails."""
+    codec, preset, params = _video_encoder()
+    if codec != "libx264":
+        try:
+            clip.write_videofile(str(output_path), codec=codec, preset=preset, ffmpeg_params=params, **kwargs)
+            return
+        except Exception as e:
+            logging.warning(f"{codec} encode failed, falling back to libx264: {e}")
+
+    clip.write_videofile(str(output_path), codec="libx264", preset=x264_preset, ffmpeg_params=x264_params, **kwargs)
+
+
+def _probe_duration(path: str) -> float | None:
+    """Container duration in seconds via ffprobe, or None if it can't be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # Key the cache on mtime/size so an overwritten file is probed again
+    return _cached_probe_duration(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_probe_duration(path: str, mtime_ns: int, size: int) -> float | None:
+    """Read a duration from the container header without starting a decoder."""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        return float(result.stdout.strip())
+    except Exception:
+        return None
+
+
+def _probe_copyable_videos(video_paths: list[str]) -> list[float] | None:
+    """
+    Durations of segments that can be joined by stream copy.
+
+    Returns:
+        One duration per segment, or None if ffmpeg is unavailable, a probe fails,
+        or the segments' video streams differ (the caller must re-encode)
+    """
+    if not shutil.which("ffprobe"):
+        return None
+
+    durations = []
+    signatures = set()
+    for path in video_paths:
+        try:
+            result = subprocess.run(
+                [
+                    "ffprobe", "-v", "error",
+                    "-select_streams", "v:0",
+                    "-show_entries", f"stream={','.join(_COPY_STREAM_FIELDS)}:format=duration",
+                    "-of", "json",
+                    path,
+                ],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+            info = json.loads(result.stdout)
+            stream = info["streams"][0]
+            durations.append(float(info["format"]["duration"]))
+            signatures.add(tuple(stream.get(field) for field in _COPY_STREAM_FIELDS))
+        except Exception:
+            return None
+
+    return durations if len(signatures) == 1 else None
+
+
+def _concat_entries(path: str, duration: float, target: float | None) -> list[str]:
+    """Concat-demuxer lines playing a segment trimmed or looped to target seconds, like trim_or_loop_video."""
+    entry = "file '" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+    if target is None or abs(duration - target) < 0.1:
+        return [entry]
+
+    if duration > target:
+        return [entry, f"outpoint {target:.3f}"]
+
+    # Loop whole copies, then cut the last one short
+    full_loops = int(target / duration)
+    remainder = target - full_loops * duration
+    entries = [entry] * full_loops
+    if remainder > 0.01:
+        entries += [entry, f"outpoint {remainder:.3f}"]
+    return entries
+
+
+def _mux_stream_copy(
+    video_paths: list[str],
+    video_durations: list[float],
+    target_durations: list[float | None],
+    audio_paths: list[str],
+    output_path: Path,
+    beat_path: str | None = None,
+    beat_volume: float = 1.0,
+) -> float | None:
+    """
+    Join already-encoded segments without re-encoding and lay new audio under them.
+
+    Video packets are copied through ffmpeg's concat demuxer, so only the audio
+    is encoded. audio_paths play back to back (or, when empty, the segments'
+    own audio is kept); beat_path, if given, loops underneath at beat_volume
+    for the whole video.
+
+    Args:
+        video_paths: Segment paths, from _probe_copyable_videos
+        video_durations: Probed duration of each segment
+        target_durations: Duration to trim/loop each segment to (None keeps it)
+        audio_paths: Audio files to concatenate as the main track; empty keeps the segments' audio
+        output_path: Where to save the final video
+        beat_path: Optional beat track mixed under the main audio
+        beat_volume: Volume level for the beat track (0.0-1.0)
+
+    Returns:
+        Duration of the written video, or None if ffmpeg failed
+    """
+    entries = []
+    total_duration = 0.0
+    for path, duration, target in zip(video_paths, video_durations, target_durations):
+        entries += _concat_entries(path, duration, target)
+        total_duration += duration if target is None or abs(duration - target) < 0.1 else target
+
+    from moviepy.config import FFMPEG_BINARY
+
+    num_audio = len(audio_paths)
+    if audio_paths:
+        graph = "".join(f"[{i + 1}:a]" for i in range(num_audio)) + f"concat=n={num_audio}:v=0:a=1"
+    else:
+        graph = "[0:a]anull"
+    graph = _finish_audio_graph(graph, num_audio + 1 if beat_path else None, beat_volume)
+
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+        list_file = f.name
+        f.write("\n".join(entries) + "\n")
+
+    cmd = [FFMPEG_BINARY, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", list_file]
+    for audio_path in audio_paths:
+        cmd += ["-i", audio_path]
+    if beat_path:
+        cmd += ["-stream_loop", "-1", "-i", beat_path]
+    cmd += [
+        "-filter_complex", graph,
+        "-map", "0:v:0", "-map", "[aout]",
+        "-c:v", "copy", "-c:a", "aac",
+        # Audio runs past the video when it's longer (and the looped beat never ends)
+        "-t", f"{total_duration:.3f}",
+        str(output_path),
+    ]
+
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        return total_duration if result.returncode == 0 else None
+    except Exception:
+        return None
+    finally:
+        os.unlink(list_file)
+
+
+def _finish_audio_graph(vocals: str, beat_input: int | None, beat_volume: float) -> str:
+    """Label a graph's vocal output [aout], first mixing the looped beat input under it if given."""
+    if beat_input is not None:
+        vocals += (
+            f"[vocals];[{beat_input}:a]volume={beat_volume}[beat];"
+            "[vocals][beat]amix=inputs=2:duration=longest:normalize=0"
+        )
+    return vocals + "[aout]"
+
+
+def _render_crossfade(
+    video_paths: list[str],
+    video_durations: list[float],
+    target_durations: list[float | None],
+    crossfade: float,
+    audio_paths: list[str],
+    output_path: Path,
+    beat_path: str | None = None,
+    beat_volume: float = 1.0,
+) -> float | None:
+    """
+    Join matching segments with crossfades in a single ffmpeg encode.
+
+    Segments overlap by crossfade seconds like moviepy's method="compose" with
+    negative padding, but the blend is ffmpeg's xfade filter instead of
+    per-frame numpy compositing. Audio follows _mux_stream_copy: audio_paths
+    play back to back, or when empty the segments' own audio is crossfaded
+    with acrossfade; beat_path loops underneath at beat_volume.
+
+    Args:
+        video_paths: Segment paths, from _probe_copyable_videos
+        video_durations: Probed duration of each segment
+        target_durations: Duration to trim/loop each segment to (None keeps it)
+        crossfade: Overlap between consecutive segments in seconds
+        audio_paths: Audio files to concatenate as the main track; empty keeps the segments' audio
+        output_path: Where to save the final video
+        beat_path: Optional beat track mixed under the main audio
+        beat_volume: Volume level for the beat track (0.0-1.0)
+
+    Returns:
+        Duration of the written video, or None if ffmpeg failed or a segment is
+        shorter than the crossfade
+    """
+    from moviepy.config import FFMPEG_BINARY
+
+    cmd = [FFMPEG_BINARY, "-y", "-v", "error"]
+    lengths = []
+    for path, duration, target in zip(video_paths, video_durations, target_durations):
+        if target is None or abs(duration - target) < 0.1:
+            lengths.append(duration)
+        else:
+            # Input-side trim, looping first when the segment is too short (trim_or_loop_video)
+            if duration < target:
+                cmd += ["-stream_loop", "-1"]
+            cmd += ["-t", f"{target:.3f}"]
+            lengths.append(target)
+        cmd += ["-i", path]
+
+    if min(lengths) <= crossfade:
+        return None
+
+    num_videos = len(video_paths)
+    filters = [f"[{i}:v]setpts=PTS-STARTPTS,fps=24[v{i}]" for i in range(num_videos)]
+    video_label = "v0"
+    offset = 0.0
+    for i in range(1, num_videos):
+        offset += lengths[i - 1] - crossfade
+        filters.append(
+            f"[{video_label}][v{i}]xfade=transition=fade:duration={crossfade:.3f}:offset={offset:.3f}[x{i}]"
+        )
+        video_label = f"x{i}"
+    total_duration = sum(lengths) - crossfade * (num_videos - 1)
+
+    for audio_path in audio_paths:
+        cmd += ["-i", audio_path]
+    num_audio = len(audio_paths)
+    if audio_paths:
+        vocals = "".join(f"[{num_videos + i}:a]" for i in range(num_audio)) + f"concat=n={num_audio}:v=0:a=1"
+    else:
+        vocals = "[0:a]anull"
+        for i in range(1, num_videos):
+            filters.append(f"{vocals}[a{i}]")
+            vocals = f"[a{i}][{i}:a]acrossfade=d={crossfade:.3f}"
+    if beat_path:
+        cmd += ["-stream_loop", "-1", "-i", beat_path]
+    filters.append(_finish_audio_graph(vocals, num_videos + num_audio if beat_path else None, beat_volume))
+
+    cmd += [
+        "-filter_complex", ";".join(filters),
+        "-map", f"[{video_label}]", "-map", "[aout]",
+        "-c:a", "aac",
+        # Audio runs past the video when it's longer (and the looped beat never ends)
+        "-t", f"{total_duration:.3f}",
+    ]
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    codec, preset, params = _video_encoder()
+    encoders = [(codec, preset, params)]
+    if codec != "libx264":
+        encoders.append(("libx264", FINAL_PRESET, []))
+    for codec, preset, params in encoders:
+        try:
+            result = subprocess.run(
+                cmd + ["-c:v", codec, "-preset", preset, *params, "-pix_fmt", "yuv420p", str(output_path)],
+                capture_output=True,
+                text=True,
+                timeout=600,
+            )
+        except Exception:
+            return None
+        if result.returncode == 0:
+            return total_duration
+        logging.warning(f"ffmpeg crossfade render with {codec} failed: {result.stderr.strip()[-300:]}")
+    return None
+
+
+def _validate_inputs(paths: list[str]) -> list[str]:
+    """
+    Read every packet of each input without decoding, to catch bad files before composing.
+
+    Missing, truncated or corrupt inputs otherwise only fail deep inside
+    write_videofile, after most of the encode has run. The files are checked
+    concurrently and each check is a demux-only pass, so this takes milliseconds.
+
+    Returns:
+        One "name: reason" message per unreadable input (empty if all are fine)
+    """
+    from moviepy.config import FFMPEG_BINARY
+
+    def check(path: str) -> str | None:
+        try:
+            result = subprocess.run(
+                [FFMPEG_BINARY, "-v", "error", "-i", path, "-map", "0", "-c", "copy", "-f", "null", "-"],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+        except Exception:
+            # Couldn't run the check itself; leave it to the compose step
+            return None
+        if result.returncode == 0:
+            return None
+        reason = result.stderr.strip().splitlines()
+        return f"{Path(path).name}: {reason[-1] if reason else 'unreadable'}"
+
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(paths)))) as executor:
+        return [error for error in executor.map(check, paths) if error]
+
+
+def _close_clips(clips) -> None:
+    """Close each clip's ffmpeg readers, ignoring clips that fail to close."""
+    for clip in clips:
+        try:
+            clip.close()
+        except Exception:
+            pass
+
+
+def _open_clips(
+    audio_paths: list[str],
+    video_paths: list[str],
+) -> tuple[list[AudioFileClip], list[VideoFileClip]]:
+    """
+    Open audio and video clips concurrently.
+
+    Each clip starts its own ffmpeg probe and reader processes, so opening them
+    side by side takes about as long as the slowest file. If any file fails to
+    open, the clips that did open are closed before the error is raised.
+
+    Returns:
+        Tuple of (audio clips, video clips) in input order
+    """
+    loaders = [AudioFileClip] * len(audio_paths) + [VideoFileClip] * len(video_paths)
+    paths = list(audio_paths) + list(video_paths)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(paths)))) as executor:
+        futures = [executor.submit(loader, path) for loader, path in zip(loaders, paths)]
+
+    clips = []
+    error = None
+    for future in futures:
+        try:
+            clips.append(future.result())
+        except Exception as e:
+            error = error or e
+
+    if error is not None:
+        _close_clips(clips)
+        raise error
+
+    return clips[:len(audio_paths)], clips[len(audio_paths):]
+
+
 def compose_battle_video(
     video_paths: list[str],
     audio_path: str,
@@ -89,16 +513,38 @@ def compose_battle_video(
     if not video_paths:
         return None, "Error: No video paths provided"
 
+    input_errors = _validate_inputs([*video_paths, audio_path])
+    if input_errors:
+        return None, f"Error: Unreadable input {'; '.join(input_errors)}"
+
     if output_path is None:
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         output_path = OUTPUTS_DIR / "rap_battle_final.mp4"
 
+    # Matching segments skip moviepy: hard cuts copy the video, crossfades are one xfade encode
+    video_durations = _probe_copyable_videos(video_paths)
+    if video_durations:
+        targets = [
+            segment_durations[i] if segment_durations and i < len(segment_durations) else None
+            for i in range(len(video_paths))
+        ]
+        if crossfade_duration <= 0 or len(video_paths) == 1:
+            total_duration = _mux_stream_copy(video_paths, video_durations, targets, [audio_path], output_path)
+        else:
+            total_duration = _render_crossfade(
+                video_paths, video_durations, targets, crossfade_duration, [audio_path], output_path
+            )
+        if total_duration is not None:
+            return str(output_path), f"Final video created: {output_path}"
+
     clips = []
+    opened = []
     try:
-        # Load all video clips
-        for i, path in enumerate(video_paths):
-            clip = VideoFileClip(path)
+        # Load the audio and all video clips together
+        (audio,), loaded_clips = _open_clips([audio_path], video_paths)
+        opened = [audio, *loaded_clips]
 
+        for i, clip in enumerate(loaded_clips):
             # Adjust duration if specified
             if segment_durations and i < len(segment_durations):
                 target_duration = segment_durations[i]
@@ -116,9 +562,6 @@ def compose_battle_video(
         else:
             final_video = concatenate_videoclips(clips)
 
-        # Load and set audio
-        audio = AudioFileClip(audio_path)
-
         # Match video duration to audio or vice versa
         video_duration = final_video.duration
         audio_duration = audio.duration
@@ -136,12 +579,11 @@ def compose_battle_video(
 
         # Export
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        final_video.write_videofile(
+        _write_video(
+            final_video,
             str(output_path),
-            codec="libx264",
             audio_codec="aac",
             fps=24,
-            preset="medium",
             threads=4,
         )
 
@@ -151,12 +593,8 @@ def compose_battle_video(
         return None, f"Error composing video: {e}"
 
     finally:
-        # Clean up clips
-        for clip in clips:
-            try:
-                clip.close()
-            except:
-                pass
+        # Close the opened clips; trimmed/looped copies share their readers
+        _close_clips(opened)
 
 
 def compose_with_continuous_beat(
@@ -182,21 +620,52 @@ def compose_with_continuous_beat(
     Returns:
         Tuple of (final_video_path, status_message)
     """
-    from moviepy import CompositeAudioClip
-
     if not lipsynced_video_paths:
         return None, "Error: No video paths provided"
 
+    input_errors = _validate_inputs([*lipsynced_video_paths, beat_path])
+    if input_errors:
+        return None, f"Error: Unreadable input {'; '.join(input_errors)}"
+
     if output_path is None:
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         output_path = OUTPUTS_DIR / "rap_battle_final.mp4"
 
-    clips = []
+    # Matching segments skip moviepy: hard cuts copy video and vocals (only the beat mix is
+    # encoded), crossfades are one xfade encode
+    video_durations = _probe_copyable_videos(lipsynced_video_paths)
+    if video_durations:
+        targets = [None] * len(lipsynced_video_paths)
+        if crossfade_duration <= 0 or len(lipsynced_video_paths) == 1:
+            total_duration = _mux_stream_copy(
+                lipsynced_video_paths,
+                video_durations,
+                targets,
+                [],
+                output_path,
+                beat_path=beat_path,
+                beat_volume=beat_volume,
+            )
+        else:
+            total_duration = _render_crossfade(
+                lipsynced_video_paths,
+                video_durations,
+                targets,
+                crossfade_duration,
+                [],
+                output_path,
+                beat_path=beat_path,
+                beat_volume=beat_volume,
+            )
+        if total_duration is not None:
+            return str(output_path), f"Final video with continuous beat: {output_path}"
+
+    opened = []
+    joined_path = None
     try:
-        # Load all lip-synced video clips
-        for path in lipsynced_video_paths:
-            clip = VideoFileClip(path)
-            clips.append(clip)
+        # Load the beat track and all lip-synced video clips together
+        (beat_audio,), clips = _open_clips([beat_path], lipsynced_video_paths)
+        opened = [beat_audio, *clips]
 
         # Concatenate videos with crossfade
         if crossfade_duration > 0 and len(clips) > 1:
@@ -212,10 +681,33 @@ def compose_with_continuous_beat(
 
         # Get the vocal audio from the concatenated video
         vocal_audio = final_video.audio
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Load the continuous beat track
-        beat_audio = AudioFileClip(beat_path)
+        if vocal_audio:
+            # Render the joined video with its vocals, then loop the beat under them in
+            # one ffmpeg pass (copying the video) instead of mixing samples in moviepy
+            joined_path = output_path.with_name(f"{output_path.stem}_vocals{output_path.suffix}")
+            _write_video(
+                final_video,
+                str(joined_path),
+                audio_codec="aac",
+                fps=24,
+                threads=4,
+            )
+            mixed = _mux_stream_copy(
+                [str(joined_path)],
+                [video_duration],
+                [None],
+                [],
+                output_path,
+                beat_path=beat_path,
+                beat_volume=beat_volume,
+            )
+            if mixed is None:
+                return None, "Error composing video: ffmpeg failed to mix the beat"
+            return str(output_path), f"Final video with continuous beat: {output_path}"
 
+        # No vocals: the beat alone becomes the soundtrack
         # Trim or loop beat to match video duration
         if beat_audio.duration < video_duration:
             # Loop the beat
@@ -227,23 +719,14 @@ def compose_with_continuous_beat(
         # Adjust beat volume
         beat_audio = beat_audio.with_volume_scaled(beat_volume)
 
-        # Mix vocal audio with beat
-        if vocal_audio:
-            mixed_audio = CompositeAudioClip([vocal_audio, beat_audio])
-        else:
-            mixed_audio = beat_audio
-
-        # Set the mixed audio on the video
-        final_video = final_video.with_audio(mixed_audio)
+        final_video = final_video.with_audio(beat_audio)
 
         # Export
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        final_video.write_videofile(
+        _write_video(
+            final_video,
             str(output_path),
-            codec="libx264",
             audio_codec="aac",
             fps=24,
-            preset="medium",
             threads=4,
         )
 
@@ -253,11 +736,9 @@ def compose_with_continuous_beat(
         return None, f"Error composing video: {e}"
 
     finally:
-        for clip in clips:
-            try:
-                clip.close()
-            except:
-                pass
+        _close_clips(opened)
+        if joined_path is not None:
+            joined_path.unlink(missing_ok=True)
 
 
 def compose_with_audio_clips(
@@ -286,7 +767,7 @@ def compose_with_audio_clips(
     Returns:
         Tuple of (final_video_path, status_message)
     """
-    from moviepy import CompositeAudioClip, concatenate_audioclips
+    from moviepy import concatenate_audioclips
 
     # Support both full mode (5 videos, 4 audio) and test mode (3 videos, 2 audio)
     if len(video_paths) not in [3, 5]:
@@ -294,31 +775,64 @@ def compose_with_audio_clips(
     if len(audio_clips) not in [2, 4]:
         return None, f"Error: Expected 2 or 4 audio clips, got {len(audio_clips)}"
 
+    input_errors = _validate_inputs([*video_paths, *audio_clips, *([beat_path] if beat_path else [])])
+    if input_errors:
+        return None, f"Error: Unreadable input {'; '.join(input_errors)}"
+
     if output_path is None:
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         output_path = OUTPUTS_DIR / "rap_battle_final.mp4"
 
+    # Matching segments skip moviepy: hard cuts copy the video, crossfades are one xfade encode
+    video_durations = _probe_copyable_videos(video_paths)
+    audio_durations = [_probe_duration(path) for path in audio_clips]
+    if video_durations and None not in audio_durations:
+        # Same targets as the moviepy path below: each verse's audio, then a <=5s conclusion
+        targets = audio_durations + [
+            min(duration, 5.0) for duration in video_durations[len(audio_clips):]
+        ]
+        if video_crossfade <= 0:
+            total_duration = _mux_stream_copy(
+                video_paths,
+                video_durations,
+                targets,
+                audio_clips,
+                output_path,
+                beat_path=beat_path,
+                beat_volume=beat_volume,
+            )
+        else:
+            total_duration = _render_crossfade(
+                video_paths,
+                video_durations,
+                targets,
+                video_crossfade,
+                audio_clips,
+                output_path,
+                beat_path=beat_path,
+                beat_volume=beat_volume,
+            )
+        if total_duration is not None:
+            return str(output_path), f"Final video created: {output_path} (total: {total_duration:.1f}s)"
+
     video_clips = []
-    loaded_audio = []
+    opened = []
+    joined_path = None
 
     try:
-        # Step 1: Load all audio clips first to get exact durations
-        audio_durations = []
-        for audio_path in audio_clips:
-            audio = AudioFileClip(audio_path)
-            loaded_audio.append(audio)
-            audio_durations.append(audio.duration)
+        # Step 1: Load all audio and video clips together; audio gives the exact durations
+        loaded_audio, loaded_videos = _open_clips(audio_clips, video_paths)
+        opened = [*loaded_audio, *loaded_videos]
+        audio_durations = [audio.duration for audio in loaded_audio]
 
         # Step 2: Concatenate audio clips seamlessly (NO gaps, NO crossfade)
         # This preserves the perfect beat sync
         combined_audio = concatenate_audioclips(loaded_audio)
         total_audio_duration = combined_audio.duration
 
-        # Step 3: Load and adjust video clips to match audio durations exactly
+        # Step 3: Adjust video clips to match audio durations exactly
         num_audio = len(audio_clips)
-        for i, video_path in enumerate(video_paths):
-            video = VideoFileClip(video_path)
-
+        for i, video in enumerate(loaded_videos):
             if i < num_audio:
                 # Match video to exact audio duration
                 target_duration = audio_durations[i]
@@ -354,35 +868,39 @@ def compose_with_audio_clips(
             # Trim audio to match video
             combined_audio = combined_audio.subclipped(0, video_duration)
 
-        # Step 6: If separate beat track provided, mix it underneath
-        if beat_path:
-            beat_audio = AudioFileClip(beat_path)
-
-            # Loop beat to match video duration
-            if beat_audio.duration < video_duration:
-                loops_needed = int(video_duration / beat_audio.duration) + 1
-                beat_segments = [AudioFileClip(beat_path) for _ in range(loops_needed)]
-                beat_audio = concatenate_audioclips(beat_segments)
-            beat_audio = beat_audio.subclipped(0, video_duration)
-
-            # Adjust beat volume
-            beat_audio = beat_audio.with_volume_scaled(beat_volume)
+        final_video = final_video.with_audio(combined_audio)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Mix vocals + beat
-            mixed_audio = CompositeAudioClip([combined_audio, beat_audio])
-            final_video = final_video.with_audio(mixed_audio)
-        else:
-            # Just use the combined audio clips (already has beat in them)
-            final_video = final_video.with_audio(combined_audio)
+        # Step 6: If separate beat track provided, render the vocals first and loop the
+        # beat under them in one ffmpeg pass (copying the video) instead of in moviepy
+        if beat_path:
+            joined_path = output_path.with_name(f"{output_path.stem}_vocals{output_path.suffix}")
+            _write_video(
+                final_video,
+                str(joined_path),
+                audio_codec="aac",
+                fps=24,
+                threads=4,
+            )
+            mixed = _mux_stream_copy(
+                [str(joined_path)],
+                [video_duration],
+                [None],
+                [],
+                output_path,
+                beat_path=beat_path,
+                beat_volume=beat_volume,
+            )
+            if mixed is None:
+                return None, "Error composing video: ffmpeg failed to mix the beat"
+            return str(output_path), f"Final video created: {output_path} (total: {video_duration:.1f}s)"
 
-        # Step 7: Export
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        final_video.write_videofile(
+        # Step 7: Export (the audio clips already have the beat in them)
+        _write_video(
+            final_video,
             str(output_path),
-            codec="libx264",
             audio_codec="aac",
             fps=24,
-            preset="medium",
             threads=4,
         )
 
@@ -392,16 +910,63 @@ def compose_with_audio_clips(
         return None, f"Error composing video: {e}"
 
     finally:
-        for clip in video_clips:
-            try:
-                clip.close()
-            except:
-                pass
-        for audio in loaded_audio:
-            try:
-                audio.close()
-            except:
-                pass
+        # Close the opened clips; trimmed/looped copies share their readers
+        _close_clips(opened)
+        if joined_path is not None:
+            joined_path.unlink(missing_ok=True)
+
+
+def _segment_audio(
+    audio_path: str,
+    segment_durations: list[float],
+    output_dir: Path,
+) -> list[str] | None:
+    """
+    Cut audio into consecutive segment_{i}.mp3 files with ffmpeg's segment muxer.
+
+    MP3 input is stream-copied (cuts land on frame boundaries, ~26ms); anything
+    else is encoded once. Like split_audio_into_segments, audio past the last
+    duration is dropped and segments that would start past the end are skipped.
+
+    Returns:
+        Segment paths in order, or None if ffmpeg failed
+    """
+    if not segment_durations:
+        return []
+
+    from moviepy.config import FFMPEG_BINARY
+
+    boundaries = []
+    elapsed = 0.0
+    for duration in segment_durations:
+        elapsed += duration
+        boundaries.append(elapsed)
+
+    # Clear earlier runs so a shorter input can't leave stale segments behind
+    candidates = [output_dir / f"segment_{i}.mp3" for i in range(len(segment_durations))]
+    for path in candidates:
+        path.unlink(missing_ok=True)
+
+    codec = ["-c", "copy"] if Path(audio_path).suffix.lower() == ".mp3" else ["-c:a", "libmp3lame"]
+    cmd = [FFMPEG_BINARY, "-y", "-v", "error", "-i", audio_path, "-map", "0:a:0", "-t", f"{boundaries[-1]:.3f}"]
+    cmd += codec + ["-f", "segment", "-reset_timestamps", "1"]
+    if len(boundaries) > 1:
+        cmd += ["-segment_times", ",".join(f"{t:.3f}" for t in boundaries[:-1])]
+    cmd.append(str(output_dir / "segment_%d.mp3"))
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    except Exception:
+        return None
+    if result.returncode != 0:
+        return None
+
+    segment_paths = []
+    for path in candidates:
+        if not path.exists():
+            break
+        segment_paths.append(str(path))
+    return segment_paths or None
 
 
 def split_audio_into_segments(
@@ -424,6 +989,11 @@ def split_audio_into_segments(
         output_dir = OUTPUTS_DIR / "audio_segments"
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # One ffmpeg pass cuts every segment; moviepy below is the fallback
+    segment_paths = _segment_audio(audio_path, segment_durations, output_dir)
+    if segment_paths is not None:
+        return segment_paths, f"Split audio into {len(segment_paths)} segments"
+
     try:
         audio = AudioFileClip(audio_path)
         segment_paths = []
@@ -452,6 +1022,35 @@ def split_audio_into_segments(
         return [], f"Error splitting audio: {e}"
 
 
+def _retime_stream_copy(path: str, speed_factor: float, output_path: Path) -> bool:
+    """
+    Speed a segment up or down by rescaling its video timestamps, without re-encoding.
+
+    The video packets are copied with -itsscale; only the audio (if any) is
+    re-encoded, with atempo so it stays in sync. Frames are not dropped or
+    duplicated, so the output frame rate becomes the source rate times speed_factor.
+
+    Returns:
+        True if ffmpeg wrote output_path
+    """
+    from moviepy.config import FFMPEG_BINARY
+
+    cmd = [
+        FFMPEG_BINARY, "-y", "-v", "error",
+        "-itsscale", f"{1 / speed_factor:.6f}", "-i", path,
+        "-i", path,
+        "-map", "0:v:0", "-map", "1:a:0?",
+        "-c:v", "copy",
+        "-filter:a", f"atempo={speed_factor:.6f}", "-c:a", "aac",
+        str(output_path),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        return result.returncode == 0
+    except Exception:
+        return False
+
+
 def adjust_segment_durations(
     video_paths: list[str],
     audio_path: str,
@@ -470,9 +1069,11 @@ def adjust_segment_durations(
     """
     if segment_timings is None:
         # Equal distribution across audio duration
-        audio = AudioFileClip(audio_path)
-        total_duration = audio.duration
-        audio.close()
+        total_duration = _probe_duration(audio_path)
+        if total_duration is None:
+            audio = AudioFileClip(audio_path)
+            total_duration = audio.duration
+            audio.close()
 
         segment_duration = total_duration / len(video_paths)
         segment_timings = [segment_duration * (i + 1) for i in range(len(video_paths))]
@@ -491,18 +1092,26 @@ def adjust_segment_durations(
             if abs(original_duration - duration) > 0.1:
                 # Need to adjust speed
                 speed_factor = original_duration / duration
-                adjusted_clip = clip.fx(lambda c: c.speedx(speed_factor))
-
-                # Save adjusted clip
                 adjusted_path = Path(path).parent / f"adjusted_{Path(path).name}"
-                adjusted_clip.write_videofile(
-                    str(adjusted_path),
-                    codec="libx264",
-                    fps=24,
-                    preset="fast",
-                )
-                adjusted_paths.append(str(adjusted_path))
-                adjusted_clip.close()
+
+                # Small tweaks only need new timestamps; larger ones are re-rendered at 24fps
+                if abs(speed_factor - 1) < RETIME_COPY_TOLERANCE and _retime_stream_copy(
+                    path, speed_factor, adjusted_path
+                ):
+                    adjusted_paths.append(str(adjusted_path))
+                else:
+                    adjusted_clip = clip.with_speed_scaled(speed_factor)
+
+                    # Save adjusted clip
+                    _write_video(
+                        adjusted_clip,
+                        str(adjusted_path),
+                        fps=24,
+                        x264_preset=INTERMEDIATE_PRESET,
+                        x264_params=INTERMEDIATE_X264_PARAMS,
+                    )
+                    adjusted_paths.append(str(adjusted_path))
+                    adjusted_clip.close()
             else:
                 adjusted_paths.append(path)
 
@@ -557,9 +1166,9 @@ def add_title_card(
         final = concatenate_videoclips([title_card, video])
 
         output_path = Path(video_path).parent / f"titled_{Path(video_path).name}"
-        final.write_videofile(
+        _write_video(
+            final,
             str(output_path),
-            codec="libx264",
             audio_codec="aac",
             fps=24,
         )
@@ -5,6 +5,9 @@ Adapted from voice-demo-hackathon/demo.py for rap voice generation.
 """
 
 import base64
+import bisect
+import functools
+import mmap
 import os
 import tempfile
 from pathlib import Path
@@ -12,6 +15,8 @@ from pathlib import Path
 import requests
 from dotenv import load_dotenv
 
+from app_gradio_fastapi.helpers.http import make_session, write_response
+
 # Find project root and load env files
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 load_dotenv(PROJECT_ROOT / ".env")  # Load base first
@@ -23,11 +28,48 @@ TTS_ENDPOINT = f"{BASE_URL}/api/v1/text-to-speech/generate"
 
 MAX_INPUT_LENGTH = 4096
 
+# Tempo bands as sorted lower bounds: _TEMPO_DESCRIPTIONS[i] covers
+# _TEMPO_BOUNDS[i - 1] <= bpm < _TEMPO_BOUNDS[i]; outside 60-180 is "moderate"
+_TEMPO_BOUNDS = (60, 90, 120, 150, 180)
+_TEMPO_DESCRIPTIONS = (
+    "moderate",
+    "slow, deliberate",
+    "moderate groove",
+    "energetic, punchy",
+    "rapid-fire, intense",
+    "moderate",
+)
+
+# Shared keep-alive pool so the verses of a battle reuse one TLS connection.
+_SESSION = make_session(pool_maxsize=8, retries=2)
+
 
 def file_to_base64(file_path: str) -> str:
-    """Convert a file to base64 string."""
-    with open(file_path, "rb") as file:
-        return base64.b64encode(file.read()).decode("utf-8")
+    """Convert a file to base64 string (memoized per file version)."""
+    stat = os.stat(file_path)
+    return _cached_base64(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def prepare_voice(voice_file: str | None) -> str | None:
+    """
+    Base64-encode a voice sample once so several TTS calls can share it.
+
+    Returns:
+        The encoded sample, or None if no file is given or it doesn't exist
+    """
+    if not voice_file or not os.path.exists(voice_file):
+        return None
+    return file_to_base64(voice_file)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_base64(path: str, mtime_ns: int, size: int) -> str:
+    """Encode one version of a file (mtime/size are only part of the cache key)."""
+    if size == 0:
+        return ""
+    # Encode straight from a read-only mapping so the raw bytes are never copied
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return base64.b64encode(mapped).decode("ascii")
 
 
 def _build_tempo_instructions(base_instructions: str, bpm: int | None, style: str | None) -> str:
@@ -35,18 +77,7 @@ def _build_tempo_instructions(base_instructions: str, bpm: int | None, style: st
     if not bpm:
         return base_instructions
 
-    tempo_mapping = {
-        (60, 90): "slow, deliberate",
-        (90, 120): "moderate groove",
-        (120, 150): "energetic, punchy",
-        (150, 180): "rapid-fire, intense",
-    }
-
-    tempo_desc = "moderate"
-    for (low, high), desc in tempo_mapping.items():
-        if low <= bpm < high:
-            tempo_desc = desc
-            break
+    tempo_desc = _TEMPO_DESCRIPTIONS[bisect.bisect_right(_TEMPO_BOUNDS, bpm)]
 
     style_suffix = f" {style} style" if style else ""
     return f"{base_instructions}. Delivery: {tempo_desc} at {bpm} BPM{style_suffix}"
@@ -59,6 +90,7 @@ def generate_rap_voice(
     temperature: float = 1.0,
     beat_bpm: int | None = None,
     beat_style: str | None = None,
+    voice_b64: str | None = None,
 ) -> tuple[str | None, str]:
     """
     Generate rap audio from lyrics using Grok Voice API.
@@ -70,6 +102,7 @@ def generate_rap_voice(
         temperature: Sampling temperature (higher = more variation)
         beat_bpm: Optional tempo in BPM for tempo-aware delivery
         beat_style: Optional beat style for context
+        voice_b64: Optional voice sample already encoded by prepare_voice (skips voice_file)
 
     Returns:
         Tuple of (audio_file_path, status_message)
@@ -81,10 +114,10 @@ def generate_rap_voice(
         return None, "Error: No lyrics provided"
 
     # Prepare voice cloning if file provided
-    voice_base64 = None
-    if voice_file and os.path.exists(voice_file):
+    voice_base64 = voice_b64
+    if voice_base64 is None:
         try:
-            voice_base64 = file_to_base64(voice_file)
+            voice_base64 = prepare_voice(voice_file)
         except Exception as e:
             return None, f"Error reading voice file: {e}"
 
@@ -108,7 +141,7 @@ def generate_rap_voice(
     }
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             TTS_ENDPOINT,
             json=payload,
             stream=True,
@@ -128,9 +161,8 @@ def generate_rap_voice(
                 delete=False,
             )
 
-            for chunk in response.iter_content(chunk_size=8192):
-                output_file.write(chunk)
-            output_file.close()
+            with output_file:
+                write_response(response, output_file)
 
             return output_file.name, f"Audio generated successfully"
         else:
@@ -0,0 +1,82 @@
+import pytest
+
+from app_gradio_fastapi.helpers import circuit_breaker
+from app_gradio_fastapi.helpers.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("Test", failure_threshold=3, window=30.0, cooldown=30.0)
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_opens_after_threshold_failures(breaker, clock):
+    for _ in range(3):
+        assert not breaker.is_open()
+        breaker.record_failure()
+        clock.now += 1
+    assert breaker.is_open()
+
+
+def test_failed_probe_reopens_after_cooldown(breaker, clock):
+    trip(breaker)
+    for _ in range(2):
+        clock.now += 31
+        assert not breaker.is_open()  # half-open: one probe goes through
+        breaker.record_failure()  # probe fails more than `window` after the last failure
+        assert breaker.is_open()
+
+
+def test_successful_probe_closes(breaker, clock):
+    trip(breaker)
+    clock.now += 31
+    assert not breaker.is_open()
+    breaker.record_success()
+    breaker.record_failure()
+    assert not breaker.is_open()
+
+
+def test_stale_failures_reset_after_window(breaker, clock):
+    breaker.record_failure()
+    clock.now += 31
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open()
+
+
+def test_half_open_lets_one_probe_through(breaker, clock):
+    trip(breaker)
+    clock.now += 31
+    assert not breaker.is_open()  # the probe
+    assert breaker.is_open()  # concurrent callers still fail fast
+    assert breaker.is_open()
+
+
+def test_unreported_probe_is_replaced_after_cooldown(breaker, clock):
+    trip(breaker)
+    clock.now += 31
+    assert not breaker.is_open()  # probe whose result is never recorded
+    clock.now += 10
+    assert breaker.is_open()
+    clock.now += 21
+    assert not breaker.is_open()  # a new probe is handed out
+    assert breaker.is_open()